@@ -1,16 +1,43 @@
 
 import os
+import io
 import json
+import time
+import random
+import threading
+import orjson
 from datetime import datetime
 from dotenv import load_dotenv
-from groq import Groq
+from groq import Groq, AsyncGroq
 from duckduckgo_search import DDGS
+from duckduckgo_search.exceptions import RatelimitException
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from functools import lru_cache
+from typing import Dict, List, Optional
 
 # Load environment variables
 load_dotenv()
 
+GROQ_MODEL = "llama-3.3-70b-versatile"
+
+# search_news retry backoff (seconds): base * 2**attempt + jitter, capped
+SEARCH_BACKOFF_BASE = 1.0
+SEARCH_RATELIMIT_BACKOFF_BASE = 5.0
+SEARCH_BACKOFF_MAX = 30.0
+
+SYSTEM_PROMPT_TMPL = (
+    "Eres un analista deportivo experto. Ignora el ruido, céntrate en lesiones confirmadas (OUT/DOUBTFUL) y fatiga. "
+    "Si una estrella está fuera, el impacto es altamente negativo. "
+    "Analiza las siguientes noticias sobre {team} y determina el impacto en su próximo partido. "
+    "Responde SIEMPRE con un objeto JSON válido que siga esta estructura: "
+    "{{'summary': str, 'impact_score': float (-10 a 10), 'key_factors': [str], 'confidence': int (0-100)}}."
+)
+
+
+@lru_cache(maxsize=64)
+def _system_prompt(team_name: str) -> str:
+    return SYSTEM_PROMPT_TMPL.format(team=team_name)
+
 class ImpactAnalysis(BaseModel):
     summary: str = Field(description="Resumen de 1 linea")
     impact_score: float = Field(description="Impacto de -10.0 a 10.0", ge=-10.0, le=10.0)
@@ -24,28 +51,66 @@ class SportsInvestigator:
             # Fallback or warning if key is missing during init
             print("⚠️ WARNING: GROQ_API_KEY is missing via os.getenv(). Make sure .env is loaded.")
         self.groq_client = Groq(api_key=api_key)
-        
-    def search_news(self, query: str) -> str:
-        """Search for news using DuckDuckGo with retries."""
+        # Async client lets the worker fan out one completion per team concurrently
+        self.async_groq_client = AsyncGroq(api_key=api_key)
+        # One DDGS session per thread, reused across searches (keep-alive)
+        self._ddgs_local = threading.local()
+        self._ddgs_sessions = []
+        self._ddgs_lock = threading.Lock()
+
+    def _get_ddgs(self) -> DDGS:
+        """Return this thread's DDGS instance, creating it on first use."""
+        ddgs = getattr(self._ddgs_local, "ddgs", None)
+        if ddgs is None:
+            ddgs = DDGS()
+            self._ddgs_local.ddgs = ddgs
+            with self._ddgs_lock:
+                self._ddgs_sessions.append(ddgs)
+        return ddgs
+
+    def _reset_ddgs(self):
+        """Drop this thread's DDGS instance so the next search opens a fresh session."""
+        ddgs = getattr(self._ddgs_local, "ddgs", None)
+        if ddgs is not None:
+            self._ddgs_local.ddgs = None
+            with self._ddgs_lock:
+                if ddgs in self._ddgs_sessions:
+                    self._ddgs_sessions.remove(ddgs)
+            ddgs.__exit__(None, None, None)
+
+    def close(self):
+        """Release all pooled DDGS sessions."""
+        with self._ddgs_lock:
+            sessions, self._ddgs_sessions = self._ddgs_sessions, []
+        for ddgs in sessions:
+            ddgs.__exit__(None, None, None)
+        self._ddgs_local = threading.local()
+
+    def search_news(self, query: str) -> Optional[str]:
+        """Search for news using DuckDuckGo with retries. Returns None if nothing was found."""
         print(f"🔎 Buscando noticias sobre: {query}...")
         results = []
         max_retries = 3
         
         for attempt in range(max_retries):
             try:
-                with DDGS() as ddgs:
-                    # Search specifically for news in the last day (d=1)
-                    # Note: 'timelimit' parameter might be 'd' for day or 'w' for week.
-                    results = list(ddgs.news(query, region="wt-wt", safesearch="off", timelimit="d", max_results=5))
-                    if results:
-                        break # Success
+                ddgs = self._get_ddgs()
+                # Search specifically for news in the last day (d=1)
+                # Note: 'timelimit' parameter might be 'd' for day or 'w' for week.
+                results = list(ddgs.news(query, region="wt-wt", safesearch="off", timelimit="d", max_results=5))
+                if results:
+                    break # Success
             except Exception as e:
                 print(f"⚠️ Intento {attempt+1}/{max_retries} fallido: {e}")
-                import time
-                time.sleep(1) # Wait before retry
+                self._reset_ddgs()
+                if attempt + 1 < max_retries:
+                    # Rate limits need a longer cool-down than transient connection errors
+                    base = SEARCH_RATELIMIT_BACKOFF_BASE if isinstance(e, RatelimitException) else SEARCH_BACKOFF_BASE
+                    time.sleep(min(SEARCH_BACKOFF_MAX, base * 2 ** attempt + random.random()))
 
         if not results:
-            return "No se encontraron noticias recientes relevantes en las últimas 24h o hubo un error de conexión."
+            print("No se encontraron noticias recientes relevantes en las últimas 24h o hubo un error de conexión.")
+            return None
             
         context = ""
         for r in results:
@@ -57,48 +122,136 @@ class SportsInvestigator:
         
         return context
 
-    def analyze_impact(self, news_context: str, team_name: str) -> dict:
+    def _no_data_analysis(self) -> dict:
+        return {
+            "summary": "No hay datos suficientes para análisis o error en búsqueda.",
+            "impact_score": 0.0,
+            "key_factors": ["Falta de información reciente"],
+            "confidence": 0
+        }
+
+    def _error_analysis(self, error: Exception) -> dict:
+        print(f"Error en LLM: {str(error)}")
+        return {
+            "summary": "Error en análisis AI",
+            "impact_score": 0.0,
+            "key_factors": [str(error)],
+            "confidence": 0
+        }
+
+    def _build_request(self, news_context: str, team_name: str) -> dict:
+        """Build the chat completion request body shared by the sync and async paths."""
+        return {
+            "model": GROQ_MODEL,
+            "messages": [
+                {"role": "system", "content": _system_prompt(team_name)},
+                {"role": "user", "content": f"Noticias recientes:\n{news_context}"}
+            ],
+            "temperature": 0,
+            "response_format": {"type": "json_object"}
+        }
+
+    def analyze_impact(self, news_context: Optional[str], team_name: str) -> dict:
         """Analyze impact using Groq LLM with JSON mode."""
-        if "Error" in news_context or "No se encontraron" in news_context:
-             return {
-                "summary": "No hay datos suficientes para análisis o error en búsqueda.",
-                "impact_score": 0.0,
-                "key_factors": ["Falta de información reciente"],
-                "confidence": 0
-            }
+        if not news_context:
+            return self._no_data_analysis()
 
         print(f"🧠 Analizando impacto para {team_name}...")
-        
-        system_prompt = (
-            "Eres un analista deportivo experto. Ignora el ruido, céntrate en lesiones confirmadas (OUT/DOUBTFUL) y fatiga. "
-            "Si una estrella está fuera, el impacto es altamente negativo. "
-            f"Analiza las siguientes noticias sobre {team_name} y determina el impacto en su próximo partido. "
-            "Responde SIEMPRE con un objeto JSON válido que siga esta estructura: "
-            "{'summary': str, 'impact_score': float (-10 a 10), 'key_factors': [str], 'confidence': int (0-100)}."
-        )
 
         try:
             completion = self.groq_client.chat.completions.create(
-                model="llama-3.3-70b-versatile",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": f"Noticias recientes:\n{news_context}"}
-                ],
-                temperature=0,
-                response_format={"type": "json_object"} 
+                **self._build_request(news_context, team_name)
             )
             
             response_content = completion.choices[0].message.content
-            return json.loads(response_content)
+            return orjson.loads(response_content)
             
         except Exception as e:
-            print(f"Error en LLM: {str(e)}")
-            return {
-                "summary": "Error en análisis AI",
-                "impact_score": 0.0,
-                "key_factors": [str(e)],
-                "confidence": 0
-            }
+            return self._error_analysis(e)
+
+    async def analyze_impact_async(self, news_context: Optional[str], team_name: str) -> dict:
+        """Async variant of analyze_impact (non-blocking Groq call)."""
+        if not news_context:
+            return self._no_data_analysis()
+
+        print(f"🧠 Analizando impacto para {team_name}...")
+
+        try:
+            completion = await self.async_groq_client.chat.completions.create(
+                **self._build_request(news_context, team_name)
+            )
+            return orjson.loads(completion.choices[0].message.content)
+        except Exception as e:
+            return self._error_analysis(e)
+
+    def analyze_batch(self, news_by_team: Dict[str, Optional[str]], timeout: float = 600) -> Optional[Dict[str, dict]]:
+        """
+        Analyze many teams with a single Groq Batch job.
+
+        Returns a dict keyed by team name, or None if the batch could not be
+        submitted or did not finish within `timeout` seconds (caller should
+        fall back to per-team completions).
+        """
+        results = {}
+        lines = []
+        for team_name, news_context in news_by_team.items():
+            if not news_context:
+                results[team_name] = self._no_data_analysis()
+                continue
+            lines.append(orjson.dumps({
+                "custom_id": team_name,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": self._build_request(news_context, team_name)
+            }))
+
+        if not lines:
+            return results
+
+        print(f"📦 Enviando batch de {len(lines)} equipos a Groq...")
+        try:
+            batch_file = self.groq_client.files.create(
+                file=("ai_insights_batch.jsonl", io.BytesIO(b"\n".join(lines))),
+                purpose="batch"
+            )
+            batch = self.groq_client.batches.create(
+                input_file_id=batch_file.id,
+                endpoint="/v1/chat/completions",
+                completion_window="24h"
+            )
+
+            # Poll with exponential backoff until done or timeout
+            deadline = time.monotonic() + timeout
+            delay = 5.0
+            while batch.status not in ("completed", "failed", "expired", "cancelled"):
+                if time.monotonic() + delay > deadline:
+                    print(f"⏱️ Batch {batch.id} no terminó en {timeout}s. Cancelando...")
+                    self.groq_client.batches.cancel(batch.id)
+                    return None
+                time.sleep(delay)
+                delay = min(delay * 2, 60.0)
+                batch = self.groq_client.batches.retrieve(batch.id)
+
+            if batch.status != "completed" or not batch.output_file_id:
+                print(f"⚠️ Batch {batch.id} terminó con estado {batch.status}")
+                return None
+
+            output = self.groq_client.files.content(batch.output_file_id).read()
+        except Exception as e:
+            print(f"Error en batch LLM: {str(e)}")
+            return None
+
+        for line in output.splitlines():
+            if not line.strip():
+                continue
+            try:
+                item = orjson.loads(line)
+                body = item["response"]["body"]
+                results[item["custom_id"]] = orjson.loads(body["choices"][0]["message"]["content"])
+            except (KeyError, IndexError, TypeError, ValueError) as e:
+                print(f"⚠️ Línea de batch inválida: {e}")
+
+        return results
 
 if __name__ == "__main__":
     # Test script setup
@@ -117,7 +270,7 @@ if __name__ == "__main__":
         # 1. Search
         # Adding 'injuries' to query to be specific
         news = investigator.search_news(f"{target_team} injuries news")
-        print(f"\n📰 Contexto Recopilado:\n{news}")
+        print(f"\n📰 Contexto Recopilado:\n{news or 'Sin noticias'}")
         
         # 2. Analyze
         analysis = investigator.analyze_impact(news, target_team)
@@ -7,18 +7,23 @@ and cache results in SQLite for instant access.
 Usage:
     python -m backend.ai_worker           # Analyze all teams for today
     python -m backend.ai_worker --team "Lakers"  # Analyze specific team
+    python -m backend.ai_worker --loop           # Run continuously (rate-limited)
 """
 
 import sys
+import time
+import asyncio
 import argparse
 from pathlib import Path
 from datetime import datetime, timedelta
+from typing import Optional
+from cachetools import TTLCache
 
 # Add parent to path for imports
 BASE_DIR = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(BASE_DIR))
 
-from backend.database import init_db, save_ai_insight, get_ai_insight
+from backend.database import init_db, save_ai_insight, get_ai_insight, get_insights_for_date
 from backend.timezone import get_current_datetime, get_current_date
 
 # Try to import AI Investigator
@@ -29,30 +34,77 @@ except ImportError:
     AI_AVAILABLE = False
     print("[AI Worker] WARNING: ai_researcher module not available")
 
+# Max Groq/DDG requests in flight during the daily fan-out
+MAX_CONCURRENT_ANALYSES = 10
+
+# Submit the daily run as one Groq Batch job; fall back to per-team calls
+# if the batch is not done within GROQ_BATCH_TIMEOUT seconds
+USE_GROQ_BATCH = True
+GROQ_BATCH_TIMEOUT = 600
+
+# Long-running mode (--loop): Groq requests per minute budget, consumer count,
+# and how often today's schedule is re-checked for uncached teams
+GROQ_RPM = 30
+LOOP_WORKERS = 4
+LOOP_REFRESH_SECONDS = 30 * 60
+
+# Today's teams, keyed by NBA date; the schedule CSV does not change intra-day
+_todays_teams_cache = TTLCache(maxsize=4, ttl=3600)
+
+SCHEDULE_PATH = BASE_DIR / "nba_engine" / "Data" / "nba-2025-UTC.csv"
+
+# Parsed schedule, reloaded only when the CSV's mtime changes
+_SCHEDULE_CACHE = {"mtime": None, "df": None}
+
+
+def _load_schedule():
+    """Return the parsed season schedule with a precomputed nba_date column."""
+    import pandas as pd
+    
+    mtime = SCHEDULE_PATH.stat().st_mtime
+    if _SCHEDULE_CACHE["df"] is not None and _SCHEDULE_CACHE["mtime"] == mtime:
+        return _SCHEDULE_CACHE["df"]
+    
+    # Only the columns we filter on; team names repeat all season, so categories
+    df = pd.read_csv(
+        SCHEDULE_PATH,
+        usecols=["Date", "Home Team", "Away Team"],
+        dtype={"Date": str, "Home Team": "category", "Away Team": "category"},
+    )
+    df["Date"] = pd.to_datetime(df["Date"], format="%d/%m/%Y %H:%M", cache=True)
+    # Adjust for NBA timezone (games after midnight UTC are still "today")
+    df["nba_date"] = (df["Date"] - pd.Timedelta(hours=6)).dt.date
+    
+    _SCHEDULE_CACHE["mtime"] = mtime
+    _SCHEDULE_CACHE["df"] = df
+    return df
+
 
 def get_todays_teams() -> list:
     """Get all unique teams playing today from schedule CSV."""
+    import numpy as np
     import pandas as pd
     
-    schedule_path = BASE_DIR / "nba_engine" / "Data" / "nba-2025-UTC.csv"
+    today = get_current_datetime()
+    target_date = today.date()
+    
+    cached = _todays_teams_cache.get(target_date)
+    if cached is not None:
+        return list(cached)
     
     try:
-        df = pd.read_csv(schedule_path, parse_dates=["Date"], date_format="%d/%m/%Y %H:%M")
-        
-        today = get_current_datetime()
-        target_date = today.date()
-        
-        # Adjust for NBA timezone (games after midnight UTC are still "today")
-        nba_time = df["Date"] - timedelta(hours=6)
-        todays_games = df[nba_time.dt.date == target_date]
+        df = _load_schedule()
+        mask = df["nba_date"].values == target_date
         
         # Get unique teams
-        home_teams = todays_games["Home Team"].tolist()
-        away_teams = todays_games["Away Team"].tolist()
+        all_teams = pd.unique(np.concatenate([
+            df.loc[mask, "Home Team"].to_numpy(),
+            df.loc[mask, "Away Team"].to_numpy(),
+        ])).tolist()
         
-        all_teams = list(set(home_teams + away_teams))
         print(f"[AI Worker] Found {len(all_teams)} unique teams playing today")
-        return all_teams
+        _todays_teams_cache[target_date] = all_teams
+        return list(all_teams)
         
     except Exception as e:
         print(f"[AI Worker] Error reading schedule: {e}")
@@ -91,19 +143,110 @@ def analyze_team(investigator: 'SportsInvestigator', team_name: str, game_date:
         }
 
 
-def run_daily_analysis():
-    """Analyze all teams playing today."""
-    if not AI_AVAILABLE:
-        print("[AI Worker] Cannot run: AI Investigator not available")
-        return
+async def analyze_team_async(investigator: 'SportsInvestigator', team_name: str, game_date: str,
+                             semaphore: asyncio.Semaphore, news: Optional[str] = None,
+                             check_cache: bool = True, fetch_news: bool = True) -> dict:
+    """Async variant of analyze_team, bounded by a shared semaphore."""
+    async with semaphore:
+        print(f"\n[AI Worker] Analyzing {team_name}...")
+
+        if check_cache:
+            cached = await asyncio.to_thread(get_ai_insight, team_name, game_date)
+            if cached:
+                print(f"[AI Worker] Using cached insight for {team_name}")
+                return cached
+
+        try:
+            if fetch_news:
+                # DDGS is synchronous, keep it off the event loop
+                news = await asyncio.to_thread(investigator.search_news, f"{team_name} NBA injuries news")
+            analysis = await investigator.analyze_impact_async(news, team_name)
+            await asyncio.to_thread(save_ai_insight, team_name, game_date, analysis)
+            return analysis
+
+        except Exception as e:
+            print(f"[AI Worker] Error analyzing {team_name}: {e}")
+            return {
+                "summary": f"Error: {str(e)}",
+                "impact_score": 0.0,
+                "key_factors": [],
+                "confidence": 0
+            }
+
+
+async def analyze_teams_batch(investigator: 'SportsInvestigator', teams: list, game_date: str,
+                              semaphore: asyncio.Semaphore) -> tuple:
+    """
+    Analyze teams through a single Groq Batch job.
+
+    Returns (analyses, news_by_team). Teams missing from `analyses` were not
+    completed by the batch; their news is returned so the caller can fall
+    back to per-team completions without searching again.
+    """
+    async def fetch_news(team: str) -> Optional[str]:
+        async with semaphore:
+            return await asyncio.to_thread(investigator.search_news, f"{team} NBA injuries news")
+
+    news = await asyncio.gather(*(fetch_news(team) for team in teams))
+    news_by_team = dict(zip(teams, news))
+
+    analyses = await asyncio.to_thread(investigator.analyze_batch, news_by_team, GROQ_BATCH_TIMEOUT)
+    if not analyses:
+        print("[AI Worker] Groq batch unavailable, falling back to per-team analysis")
+        return {}, news_by_team
+
+    for team, analysis in analyses.items():
+        await asyncio.to_thread(save_ai_insight, team, game_date, analysis)
+    print(f"[AI Worker] Groq batch analyzed {len(analyses)}/{len(teams)} teams")
+    return analyses, news_by_team
+
+
+async def analyze_teams_async(teams: list, game_date: str, use_batch: bool = False) -> dict:
+    """
+    Analyze several teams for one date with a single investigator:
+    cached insights first (one query), then the Groq batch (use_batch, daily run
+    only: it can take up to GROQ_BATCH_TIMEOUT) / concurrent fan-out.
+    Returns {team: insight | Exception}.
+    """
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_ANALYSES)
+    news_by_team = {}
+    
+    # One query for every valid insight of the day instead of one per team
+    cached = get_insights_for_date(game_date)
+    results_by_team = {t: cached[t] for t in teams if t in cached}
+    todo = [t for t in teams if t not in results_by_team]
+    print(f"[AI Worker] {len(results_by_team)} teams already cached, {len(todo)} to analyze")
+    if not todo:
+        return results_by_team
     
+    investigator = SportsInvestigator()
+    try:
+        if use_batch and todo:
+            analyses, news_by_team = await analyze_teams_batch(investigator, todo, game_date, semaphore)
+            results_by_team.update(analyses)
+        
+        # Fan out remaining teams, at most MAX_CONCURRENT_ANALYSES in flight
+        remaining = [t for t in todo if t not in results_by_team]
+        results = await asyncio.gather(
+            *(analyze_team_async(investigator, team, game_date, semaphore, news_by_team.get(team),
+                                 check_cache=False, fetch_news=team not in news_by_team)
+              for team in remaining),
+            return_exceptions=True
+        )
+        results_by_team.update(zip(remaining, results))
+    finally:
+        investigator.close()
+    return results_by_team
+
+
+async def run_daily_analysis_async(use_batch: bool = USE_GROQ_BATCH):
+    """Analyze all teams playing today concurrently (use_batch: Groq Batch first)."""
     print(f"\n{'='*60}")
     print(f"[AI Worker] Starting Daily Analysis - {get_current_datetime()}")
     print(f"{'='*60}")
     
     # Initialize
     init_db()
-    investigator = SportsInvestigator()
     game_date = str(get_current_date())
     
     # Get teams
@@ -113,40 +256,150 @@ def run_daily_analysis():
         print("[AI Worker] No teams to analyze today")
         return
     
-    # Analyze each team
+    results_by_team = await analyze_teams_async(teams, game_date, use_batch=use_batch)
+    
     success_count = 0
-    for team in teams:
-        try:
-            result = analyze_team(investigator, team, game_date)
-            if result.get("confidence", 0) > 0:
-                success_count += 1
-        except Exception as e:
-            print(f"[AI Worker] Failed {team}: {e}")
+    for team, result in results_by_team.items():
+        if isinstance(result, Exception):
+            print(f"[AI Worker] Failed {team}: {result}")
+        elif result.get("confidence", 0) > 0:
+            success_count += 1
     
     print(f"\n{'='*60}")
     print(f"[AI Worker] Completed: {success_count}/{len(teams)} teams analyzed")
     print(f"{'='*60}")
 
 
+def run_daily_analysis(use_batch: bool = USE_GROQ_BATCH):
+    """Analyze all teams playing today. On-demand callers pass use_batch=False:
+    the Groq Batch path can wait up to GROQ_BATCH_TIMEOUT."""
+    if not AI_AVAILABLE:
+        print("[AI Worker] Cannot run: AI Investigator not available")
+        return
+    
+    asyncio.run(run_daily_analysis_async(use_batch))
+
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens per `period` seconds, bursting up to `rate`."""
+
+    def __init__(self, rate: int, period: float = 60.0):
+        self.capacity = float(rate)
+        self.tokens = float(rate)
+        self.fill_rate = rate / period
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.fill_rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.fill_rate)
+
+
+async def worker_loop():
+    """
+    Long-lived analysis loop: one investigator (and its HTTP sessions) for
+    the life of the process, a queue of teams fed every LOOP_REFRESH_SECONDS,
+    and LOOP_WORKERS consumers sharing a GROQ_RPM token bucket.
+    """
+    init_db()
+    investigator = SportsInvestigator()
+    queue: asyncio.Queue = asyncio.Queue()
+    queued = set()
+    bucket = TokenBucket(GROQ_RPM)
+    semaphore = asyncio.Semaphore(LOOP_WORKERS)
+
+    async def refresh():
+        while True:
+            try:
+                game_date = str(get_current_date())
+                teams = await asyncio.to_thread(get_todays_teams)
+                cached = await asyncio.to_thread(get_insights_for_date, game_date)
+                added = 0
+                for team in teams:
+                    key = (team, game_date)
+                    if team not in cached and key not in queued:
+                        queued.add(key)
+                        queue.put_nowait(key)
+                        added += 1
+                print(f"[AI Worker] Loop refresh: {added} teams queued ({len(cached)} cached)")
+            except Exception as e:
+                print(f"[AI Worker] Loop refresh failed: {e}")
+            await asyncio.sleep(LOOP_REFRESH_SECONDS)
+
+    async def consume():
+        while True:
+            team, game_date = await queue.get()
+            try:
+                await bucket.acquire()
+                await analyze_team_async(investigator, team, game_date, semaphore)
+            except Exception as e:
+                print(f"[AI Worker] Failed {team}: {e}")
+            finally:
+                queued.discard((team, game_date))
+                queue.task_done()
+
+    tasks = [asyncio.create_task(refresh())]
+    tasks += [asyncio.create_task(consume()) for _ in range(LOOP_WORKERS)]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+        investigator.close()
+
+
 def run_single_analysis(team_name: str):
-    """Analyze a single team (for on-demand requests)."""
+    """Analyze a single team (for on-demand requests; the caller initializes the schema)."""
     if not AI_AVAILABLE:
         print("[AI Worker] Cannot run: AI Investigator not available")
         return None
     
-    init_db()
     investigator = SportsInvestigator()
     game_date = str(get_current_date())
     
-    return analyze_team(investigator, team_name, game_date)
+    try:
+        return analyze_team(investigator, team_name, game_date)
+    finally:
+        investigator.close()
+
+
+def run_bulk_analysis(teams: list) -> dict:
+    """Analyze several teams in one pass (on-demand, e.g. stale insights seen by the API).
+    The API lifespan has already initialized the schema."""
+    if not AI_AVAILABLE:
+        print("[AI Worker] Cannot run: AI Investigator not available")
+        return {}
+    if not teams:
+        return {}
+    
+    results = asyncio.run(analyze_teams_async(list(teams), str(get_current_date())))
+    print(f"[AI Worker] Bulk analysis done for {len(results)} teams")
+    return results
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="AI Analysis Worker")
     parser.add_argument("--team", type=str, help="Analyze specific team")
+    parser.add_argument("--loop", action="store_true", help="Run continuously, re-checking today's teams")
     args = parser.parse_args()
     
-    if args.team:
+    if args.loop:
+        if not AI_AVAILABLE:
+            print("[AI Worker] Cannot run: AI Investigator not available")
+        else:
+            try:
+                asyncio.run(worker_loop())
+            except KeyboardInterrupt:
+                print("[AI Worker] Loop stopped")
+    elif args.team:
+        init_db()
         result = run_single_analysis(args.team)
         if result:
             import json
@@ -6,7 +6,7 @@ Compares stored predictions with actual NBA results.
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 
-from .database import get_history, update_prediction_result
+from .database import get_history, update_prediction_results_bulk
 from .scores import fetch_scores_for_date
 
 # Map full team names to abbreviations (Add more as needed or use a robust library)
@@ -59,9 +59,18 @@ TEAM_MAP = {
     "Jazz": "UTA", "Wizards": "WAS"
 }
 
+# Lookup keys normalized once at import ("l.a. lakers ", "LAKERS" -> same key)
+_TEAM_MAP_NORM = {k.strip().casefold(): v for k, v in TEAM_MAP.items()}
+
+# Abbreviation -> canonical full name (first full name listed for each abbr)
+ABBR_TO_PRIMARY: Dict[str, str] = {}
+for _name, _abbr in TEAM_MAP.items():
+    ABBR_TO_PRIMARY.setdefault(_abbr, _name)
+
+
 def get_team_abbr(name: str) -> str:
     """Normalize team name to abbreviation"""
-    return TEAM_MAP.get(name, name.upper()[:3]) # Fallback
+    return _TEAM_MAP_NORM.get(name.strip().casefold(), name.upper()[:3]) # Fallback
 
 def audit_predictions(date_obj: datetime) -> Dict[str, int]:
     """
@@ -72,7 +81,8 @@ def audit_predictions(date_obj: datetime) -> Dict[str, int]:
     3. Compare and update DB.
     
     Returns:
-        Stats dict: { "audited": 5, "correct": 3 }
+        Stats dict: { "audited": 5, "correct": 3 } (audited counts only games whose
+        stored result changed, so re-auditing a settled day returns 0)
     """
     date_str = date_obj.strftime("%Y-%m-%d")
     print(f"[AuditService] Running audit for {date_str}")
@@ -93,9 +103,8 @@ def audit_predictions(date_obj: datetime) -> Dict[str, int]:
         print(f"[AuditService] No scores available for {date_str}")
         return {"audited": 0, "correct": 0}
     
-    # 3. Match and Update
-    audited_count = 0
-    correct_count = 0
+    # 3. Match, then write every FINAL result in one statement
+    results = {}
     
     for pred in predictions:
         # DB status might already be FINAL, but we check anyway to update verification
@@ -118,29 +127,16 @@ def audit_predictions(date_obj: datetime) -> Dict[str, int]:
             continue
             
         if match["status"] == "FINAL":
-            # Update DB
-            success = update_prediction_result(
-                game_date=date_str,
-                home_team=home_name,
-                away_team=away_name,
-                home_score=match["home_score"],
-                away_score=match["away_score"],
-                status="FINAL"
-            )
-            
-            if success:
-                audited_count += 1
-                # Check veridict logic is inside update_prediction_result?
-                # Looking at database.py: YES, it calculates is_correct.
-                
-                # Check if it was correct (re-calculating locally for stats return)
-                predicted_winner = pred["predicted_winner"]
-                actual_winner_abbr = match["actual_winner"]
-                
-                # We need to know if predicted winner maps to actual winner abbr
-                pred_abbr = get_team_abbr(predicted_winner)
-                if pred_abbr == actual_winner_abbr:
-                    correct_count += 1
-                    
-    print(f"[AuditService] Audit complete. Audited: {audited_count}, Matches found in scores source.")
-    return {"audited": audited_count, "correct": correct_count}
+            # Keyed by stored names: the DB update matches on them
+            results[(home_name, away_name)] = {
+                "home_team": home_name,
+                "away_team": away_name,
+                "home_score": match["home_score"],
+                "away_score": match["away_score"],
+                "status": "FINAL"
+            }
+    
+    stats = update_prediction_results_bulk(date_str, list(results.values()))
+    
+    print(f"[AuditService] Audit complete. Audited: {stats['audited']}, Correct: {stats['correct']}")
+    return stats
@@ -7,9 +7,15 @@ Uses JSONB for flexible prediction storage.
 
 import os
 import json
+import atexit
+import threading
+import orjson
 import psycopg2
-from psycopg2.extras import RealDictCursor, Json
-from typing import List, Dict, Any, Optional
+from contextlib import contextmanager
+from cachetools import TTLCache
+from psycopg2.extras import RealDictCursor, Json, execute_values, register_default_jsonb
+from psycopg2.pool import ThreadedConnectionPool
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 
@@ -26,405 +32,701 @@ if DATABASE_URL:
     elif DATABASE_URL.startswith("psql://"):
         DATABASE_URL = DATABASE_URL.replace("psql://", "postgresql://", 1)
 
+# Decode JSONB columns (payload, key_factors, ...) with orjson instead of json
+register_default_jsonb(loads=orjson.loads, globally=True)
+
+# TCP keepalives so pooled connections survive Neon's idle timeouts
+_CONNECT_KWARGS = {
+    "keepalives": 1,
+    "keepalives_idle": 30,
+    "keepalives_interval": 10,
+    "keepalives_count": 5,
+}
+
+# Connection pool bounds (keep POOL_MAX_CONN under Neon's connection limit)
+POOL_MIN_CONN = int(os.getenv("DB_POOL_MIN", "2"))
+POOL_MAX_CONN = int(os.getenv("DB_POOL_MAX", "20"))
+
+
+class OJson(Json):
+    """psycopg2 Json adapter that serializes with orjson (stdlib json as fallback)."""
+
+    def dumps(self, obj):
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS).decode()
+        except TypeError:
+            # Values orjson rejects but json accepts (e.g. ints wider than 64 bits)
+            return json.dumps(obj)
+
+
 def get_connection():
-    """Get database connection"""
+    """Open a new (unpooled) database connection"""
     if not DATABASE_URL:
         raise ValueError("DATABASE_URL environment variable not set")
     
-    conn = psycopg2.connect(DATABASE_URL)
-    return conn
+    return psycopg2.connect(DATABASE_URL, **_CONNECT_KWARGS)
+
+
+# Shared pool, created lazily on first use. ThreadedConnectionPool raises
+# instead of waiting when exhausted, so callers queue on a semaphore first.
+_pool: Optional[ThreadedConnectionPool] = None
+_pool_lock = threading.Lock()
+_pool_slots = threading.BoundedSemaphore(POOL_MAX_CONN)
+
+
+def _get_pool() -> ThreadedConnectionPool:
+    global _pool
+    if _pool is None or _pool.closed:
+        with _pool_lock:
+            if _pool is None or _pool.closed:
+                if not DATABASE_URL:
+                    raise ValueError("DATABASE_URL environment variable not set")
+                _pool = ThreadedConnectionPool(POOL_MIN_CONN, POOL_MAX_CONN, DATABASE_URL, **_CONNECT_KWARGS)
+                print(f"[Database] Connection pool ready ({POOL_MIN_CONN}-{POOL_MAX_CONN})")
+    return _pool
+
+
+@contextmanager
+def db_conn():
+    """
+    Borrow a pooled connection for the duration of the block.
+    Commits on exit (rolls back on error) so the connection always goes back
+    to the pool outside a transaction.
+    """
+    _pool_slots.acquire()
+    try:
+        pool = _get_pool()
+        conn = pool.getconn()
+        if conn.closed:
+            # Dropped by the server while idle in the pool
+            pool.putconn(conn, close=True)
+            conn = pool.getconn()
+        try:
+            yield conn
+            if not conn.closed:
+                conn.commit()
+        except Exception:
+            if not conn.closed:
+                conn.rollback()
+            raise
+        finally:
+            pool.putconn(conn, close=bool(conn.closed))
+    finally:
+        _pool_slots.release()
+
+
+def close_pool():
+    """Close every pooled connection (app shutdown)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None and not _pool.closed:
+            _pool.closeall()
+            print("[Database] Connection pool closed")
+        _pool = None
+
+
+atexit.register(close_pool)
+
+
+def _missing_columns(cursor, table: str, columns: List[str]) -> set:
+    """Columns of `table` that don't exist yet. ALTER TABLE ... ADD COLUMN IF NOT
+    EXISTS takes an ACCESS EXCLUSIVE lock even when it ends up a no-op, so init_db
+    only issues it for columns this catalog read says are missing."""
+    cursor.execute(
+        "SELECT column_name FROM information_schema.columns "
+        "WHERE table_schema = current_schema() AND table_name = %s AND column_name = ANY(%s)",
+        (table, list(columns))
+    )
+    return set(columns) - {row[0] for row in cursor.fetchall()}
+
+
+# Generated-column expressions for the per-day counters (jsonb_path_query_array
+# is IMMUTABLE, so it is allowed in a STORED generated column)
+_GAMES_TOTAL_EXPR = "COALESCE(jsonb_array_length(payload->'games'), 0)"
+_GAMES_MATCHING_EXPR = "COALESCE(jsonb_array_length(jsonb_path_query_array(payload, '{path}')), 0)"
+_PATH_COMPLETED = '$.games[*] ? (@.status == "FINAL")'
+_PATH_CORRECT = '$.games[*] ? (@.is_correct == 1)'
 
 
 def init_db():
     """
     Initialize database schema for PostgreSQL.
     """
-    conn = get_connection()
-    try:
-        with conn.cursor() as cursor:
-            # 1. Predictions Table (JSONB)
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS predictions (
-                    id SERIAL PRIMARY KEY,
-                    prediction_date DATE NOT NULL UNIQUE,
-                    payload JSONB NOT NULL,
-                    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
-                );
-            """)
-
-            # 2. AI Insights Table (Migrated to standard columns for now, could be JSONB too but keeping structure)
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS ai_insights (
-                    id SERIAL PRIMARY KEY,
-                    team_name TEXT NOT NULL,
-                    game_date DATE NOT NULL,
-                    summary TEXT,
-                    impact_score REAL DEFAULT 0.0,
-                    key_factors JSONB,
-                    confidence INTEGER DEFAULT 0,
-                    created_at TIMESTAMP WITH TIME ZONE,
-                    expires_at TIMESTAMP WITH TIME ZONE,
-                    UNIQUE(team_name, game_date)
-                );
-            """)
+    with db_conn() as conn:
+        try:
+            with conn.cursor() as cursor:
+                # 1. Predictions Table (JSONB)
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS predictions (
+                        id SERIAL PRIMARY KEY,
+                        prediction_date DATE NOT NULL UNIQUE,
+                        payload JSONB NOT NULL,
+                        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+                        updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+                    );
+                """)
+                # Bumped on every payload write; drives the /api/history ETag
+                if _missing_columns(cursor, "predictions", ["updated_at"]):
+                    cursor.execute("ALTER TABLE predictions ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP;")
+                # Per-day game counters, recomputed by Postgres on every payload write;
+                # get_stats sums these instead of unpacking every stored game
+                counter_exprs = {
+                    "games_total": _GAMES_TOTAL_EXPR,
+                    "games_completed": _GAMES_MATCHING_EXPR.format(path=_PATH_COMPLETED),
+                    "games_correct": _GAMES_MATCHING_EXPR.format(path=_PATH_CORRECT),
+                }
+                missing = _missing_columns(cursor, "predictions", list(counter_exprs))
+                if missing:
+                    cursor.execute("ALTER TABLE predictions " + ", ".join(
+                        f"ADD COLUMN IF NOT EXISTS {col} INTEGER GENERATED ALWAYS AS ({expr}) STORED"
+                        for col, expr in counter_exprs.items() if col in missing
+                    ) + ";")
+
+                # 2. AI Insights Table (Migrated to standard columns for now, could be JSONB too but keeping structure)
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS ai_insights (
+                        id SERIAL PRIMARY KEY,
+                        team_name TEXT NOT NULL,
+                        game_date DATE NOT NULL,
+                        summary TEXT,
+                        impact_score REAL DEFAULT 0.0,
+                        key_factors JSONB,
+                        confidence INTEGER DEFAULT 0,
+                        created_at TIMESTAMP WITH TIME ZONE,
+                        expires_at TIMESTAMP WITH TIME ZONE,
+                        UNIQUE(team_name, game_date)
+                    );
+                """)
             
-            # Indexes
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_predictions_date ON predictions(prediction_date DESC);")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_ai_insights_team_date ON ai_insights(team_name, game_date);")
+                # Indexes
+                # prediction_date and (team_name, game_date) are already served by their
+                # UNIQUE constraints; drop the duplicate B-trees older deploys created.
+                cursor.execute("DROP INDEX IF EXISTS idx_predictions_date;")
+                cursor.execute("DROP INDEX IF EXISTS idx_ai_insights_team_date;")
+                # get_insights_for_date filters on game_date alone, which the
+                # (team_name, game_date) constraint index cannot serve.
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_ai_insights_date_expires ON ai_insights(game_date, expires_at);")
+                # Containment (@>) lookups into the day payload, e.g. "the day holding this game"
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_predictions_payload_gin ON predictions USING GIN (payload jsonb_path_ops);")
+                # Expired insights are never served; purge them to keep the table small
+                cursor.execute("DELETE FROM ai_insights WHERE expires_at < NOW();")
             
-            # 3. Bet Ledger (Fintech)
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS bet_ledger (
-                    id SERIAL PRIMARY KEY,
-                    prediction_id TEXT,
-                    date DATE NOT NULL,
-                    match TEXT NOT NULL,
-                    selection TEXT NOT NULL,
-                    odds REAL NOT NULL,
-                    stake_amount REAL NOT NULL,
-                    status TEXT DEFAULT 'PENDING',
-                    pnl REAL DEFAULT 0.0,
-                    is_real_bet BOOLEAN DEFAULT FALSE,
-                    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
-                );
-            """)
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_bet_ledger_date ON bet_ledger(date);")
-
-            # 4. Portfolio History (Fintech)
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS portfolio_history (
-                    id SERIAL PRIMARY KEY,
-                    date DATE NOT NULL UNIQUE,
-                    total_balance REAL NOT NULL,
-                    daily_profit REAL DEFAULT 0.0,
-                    roi_percentage REAL DEFAULT 0.0,
-                    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
-                );
-            """)
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_portfolio_history_date ON portfolio_history(date DESC);")
-
-            # 5. Daily Cache (Autonomous Server)
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS daily_cache (
-                    id SERIAL PRIMARY KEY,
-                    cache_date DATE NOT NULL UNIQUE,
-                    predictions_json JSONB,
-                    strategy_json JSONB,
-                    sentinel_message TEXT,
-                    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
-                );
-            """)
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_daily_cache_date ON daily_cache(cache_date DESC);")
+                # 3. Bet Ledger (Fintech)
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS bet_ledger (
+                        id SERIAL PRIMARY KEY,
+                        prediction_id TEXT,
+                        date DATE NOT NULL,
+                        match TEXT NOT NULL,
+                        selection TEXT NOT NULL,
+                        odds REAL NOT NULL,
+                        stake_amount REAL NOT NULL,
+                        status TEXT DEFAULT 'PENDING',
+                        pnl REAL DEFAULT 0.0,
+                        is_real_bet BOOLEAN DEFAULT FALSE,
+                        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+                    );
+                """)
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_bet_ledger_date ON bet_ledger(date);")
+                # PENDING is a small, shrinking slice of the ledger
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_bet_ledger_pending ON bet_ledger(id) WHERE status = 'PENDING';")
+
+                # 4. Portfolio History (Fintech)
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS portfolio_history (
+                        id SERIAL PRIMARY KEY,
+                        date DATE NOT NULL UNIQUE,
+                        total_balance REAL NOT NULL,
+                        daily_profit REAL DEFAULT 0.0,
+                        roi_percentage REAL DEFAULT 0.0,
+                        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+                    );
+                """)
+                cursor.execute("DROP INDEX IF EXISTS idx_portfolio_history_date;")  # covered by UNIQUE(date)
+
+                # 5. Daily Cache (Autonomous Server)
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS daily_cache (
+                        id SERIAL PRIMARY KEY,
+                        cache_date DATE NOT NULL UNIQUE,
+                        predictions_json JSONB,
+                        strategy_json JSONB,
+                        sentinel_message TEXT,
+                        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+                        updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+                    );
+                """)
+                cursor.execute("DROP INDEX IF EXISTS idx_daily_cache_date;")  # covered by UNIQUE(cache_date)
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_daily_cache_predictions_gin ON daily_cache USING GIN (predictions_json jsonb_path_ops);")
             
-        conn.commit()
-        print("[Database] Initialized PostgreSQL tables (predictions, ai_insights)")
-    except Exception as e:
-        print(f"[Database] Error initializing DB: {e}")
-        conn.rollback()
-    finally:
-        conn.close()
+            conn.commit()
+            print("[Database] Initialized PostgreSQL tables (predictions, ai_insights)")
+        except Exception as e:
+            print(f"[Database] Error initializing DB: {e}")
+            conn.rollback()
 
 
+from pydantic import TypeAdapter, ValidationError
 from .models import PredictionGame, DailyPredictionsPayload
 
+# Validates/dumps a whole slate in one call to the compiled validator
+_PRED_ADAPTER = TypeAdapter(List[PredictionGame])
+
+
+def _validate_games(predictions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Validate and normalize predictions (auto-filling defaults).
+    Falls back to per-row validation, skipping invalid games, only when the
+    batch as a whole fails.
+    """
+    try:
+        return _PRED_ADAPTER.dump_python(_PRED_ADAPTER.validate_python(predictions))
+    except ValidationError:
+        pass
+
+    games = []
+    for pred in predictions:
+        try:
+            games.append(PredictionGame.model_validate(pred).model_dump())
+        except ValidationError as ve:
+            print(f"[Database] Validation Warning for a game: {ve}. Skipping.")
+    return games
+
+def _nba_game_date(start_time: Optional[str]):
+    """
+    Map a UTC start time to its NBA "Game Day".
+    Returns None if the time is missing or cannot be parsed.
+    """
+    if not start_time:
+        return None
+    try:
+        # fromisoformat is C-implemented; accepts both "T" and " " separators
+        dt = datetime.fromisoformat(start_time.rstrip('Z'))
+    except ValueError:
+        return None
+    # NBA day is 6 hours behind UTC roughly for "night" games assignment
+    return (dt - timedelta(hours=6)).date()
+
+
+_SQL_UPSERT_PREDICTIONS = """
+    INSERT INTO predictions (prediction_date, payload, created_at)
+    VALUES %s
+    ON CONFLICT (prediction_date) 
+    DO UPDATE SET 
+        payload = EXCLUDED.payload,
+        created_at = CURRENT_TIMESTAMP,
+        updated_at = CURRENT_TIMESTAMP;
+"""
+
 def save_predictions(predictions: List[Dict[str, Any]]) -> int:
     """
-    Save predictions for a SINGLE DAY as one JSONB payload row.
-    If row exists for that date, it updates the payload (UPSERT).
+    Save predictions as one JSONB payload row per NBA day.
+    Rows are grouped by game day and upserted in a single statement/transaction.
     Uses Pydantic models for strict validation.
     """
     if not predictions:
         return 0
     
-    # We group predictions by date, but usually this function is called with a batch for one day.
-    # We'll assume the first prediction's date allows us to determine the 'prediction_date'.
-    # IMPORTANT: The current logic in `predictor.py` passes a list of predictions.
-    
-    # Extract the common date from the first prediction or existing logic
+    # Games whose start time can't be parsed fall back to the first prediction's day
     first_pred = predictions[0]
-    start_time = first_pred.get("start_time_utc")
     timestamp = first_pred.get("timestamp") or datetime.now().isoformat()
-    
-    # Determine the "Game Day" (NBA Logical Day)
-    if start_time:
+    default_date = _nba_game_date(first_pred.get("start_time_utc")) or datetime.now().date()
+
+    # Validate and Normalize Data using Pydantic Models
+    games_by_date: Dict[Any, List[Dict[str, Any]]] = {}
+    for game in _validate_games(predictions):
+        game_day = _nba_game_date(game.get("start_time_utc")) or default_date
+        games_by_date.setdefault(game_day, []).append(game)
+
+    if not games_by_date:
+        print("[Database] No valid games to save after validation.")
+        return 0
+
+    rows = [
+        (prediction_date, OJson({
+            "meta": {
+                "count": len(games),
+                "generated_at": timestamp
+            },
+            "games": games
+        }))
+        for prediction_date, games in games_by_date.items()
+    ]
+    saved_count = sum(len(games) for games in games_by_date.values())
+
+    with db_conn() as conn:
         try:
-            clean_time = start_time.replace('T', ' ').replace('Z', '')
-            dt = datetime.strptime(clean_time, "%Y-%m-%d %H:%M:%S")
-            # NBA day is 6 hours behind UTC roughly for "night" games assignment
-            nba_date = (dt - timedelta(hours=6)).date()
-            prediction_date = nba_date
-        except:
-            prediction_date = datetime.now().date()
-    else:
-        # Fallback
-        prediction_date = datetime.now().date()
-
-    conn = get_connection()
-    try:
-        # Validate and Normalize Data using Pydantic Models
-        # This is the "SQLModel/Pydantic" migration step requested
-        validated_games = []
-        for pred in predictions:
-            try:
-                # This throws ValidationError if crucial fields miss, or auto-fills defaults
-                model = PredictionGame(**pred)
-                validated_games.append(model.model_dump())
-            except Exception as ve:
-                print(f"[Database] Validation Warning for a game: {ve}. Skipping.")
-                continue
-
-        if not validated_games:
-            print("[Database] No valid games to save after validation.")
+            with conn.cursor() as cursor:
+                execute_values(cursor, _SQL_UPSERT_PREDICTIONS, rows, template="(%s, %s, CURRENT_TIMESTAMP)")
+            
+            conn.commit()
+            _invalidate_stats_cache()
+            days = ", ".join(str(d) for d in games_by_date)
+            print(f"[Database] Saved {saved_count} predictions for {days}")
+            return saved_count
+        except Exception as e:
+            print(f"[Database] Error saving predictions: {e}")
+            conn.rollback()
             return 0
 
-        with conn.cursor() as cursor:
-            # Prepare payload
-            payload = {
-                "meta": {
-                    "count": len(validated_games),
-                    "generated_at": timestamp
-                },
-                "games": validated_games
-            }
-            
-            cursor.execute("""
-                INSERT INTO predictions (prediction_date, payload, created_at)
-                VALUES (%s, %s, CURRENT_TIMESTAMP)
-                ON CONFLICT (prediction_date) 
-                DO UPDATE SET 
-                    payload = EXCLUDED.payload,
-                    created_at = CURRENT_TIMESTAMP;
-            """, (prediction_date, Json(payload)))
-            
-        conn.commit()
-        print(f"[Database] Saved {len(validated_games)} predictions for {prediction_date}")
-        return len(validated_games)
-    except Exception as e:
-        print(f"[Database] Error saving predictions: {e}")
-        conn.rollback()
-        return 0
-    finally:
-        conn.close()
+
+_SQL_HISTORY_RECENT_TMPL = """
+    SELECT {game} FROM predictions p
+    CROSS JOIN LATERAL jsonb_array_elements(p.payload->'games') WITH ORDINALITY AS g(game, ord)
+    ORDER BY p.prediction_date DESC, g.ord
+    LIMIT %s
+"""
+
+_SQL_HISTORY_BY_DATE_TMPL = """
+    SELECT {game} FROM predictions p
+    CROSS JOIN LATERAL jsonb_array_elements(p.payload->'games') WITH ORDINALITY AS g(game, ord)
+    WHERE p.prediction_date = %s
+    ORDER BY g.ord
+    LIMIT %s
+"""
+
+# Projections: the whole game, or the game without its free-text ai_impact
+# block (most of each element's size), stripped server-side
+_HISTORY_GAME_FULL = "g.game"
+_HISTORY_GAME_LEAN = "g.game - 'ai_impact' AS game"
+
+_SQL_HISTORY_RECENT = _SQL_HISTORY_RECENT_TMPL.format(game=_HISTORY_GAME_FULL)
+_SQL_HISTORY_BY_DATE = _SQL_HISTORY_BY_DATE_TMPL.format(game=_HISTORY_GAME_FULL)
+_SQL_HISTORY_RECENT_LEAN = _SQL_HISTORY_RECENT_TMPL.format(game=_HISTORY_GAME_LEAN)
+_SQL_HISTORY_BY_DATE_LEAN = _SQL_HISTORY_BY_DATE_TMPL.format(game=_HISTORY_GAME_LEAN)
+
+
+_SQL_HISTORY_VERSION = """
+    SELECT MAX(updated_at) AS updated, COUNT(*) AS days FROM predictions
+"""
 
 
-def get_history(limit: int = 100, game_date: Optional[str] = None) -> List[Dict[str, Any]]:
+def get_history_version(game_date: Optional[str] = None) -> Optional[str]:
     """
-    Retrieve predictions. 
-    Since we store by DAY, we fetch the days and unpack the 'games' array.
+    Cheap fingerprint of the stored history (latest write + row count),
+    used to build HTTP ETags. None if it can't be computed.
     """
-    conn = get_connection()
-    results = []
-    
-    try:
-        with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-            if game_date:
-                cursor.execute("""
-                    SELECT payload FROM predictions 
-                    WHERE prediction_date = %s
-                """, (game_date,))
-            else:
-                cursor.execute("""
-                    SELECT payload FROM predictions 
-                    ORDER BY prediction_date DESC 
-                    LIMIT %s
-                """, (limit,))
-            
-            rows = cursor.fetchall()
-            
-            for row in rows:
-                payload = row.get('payload', {})
-                games = payload.get('games', [])
-                # We extend the flat list of games
-                results.extend(games)
-                
-    except Exception as e:
-        print(f"[Database] Error getting history: {e}")
-    finally:
-        conn.close()
-        
-    # Apply limit strictly on the flattened list if needed (though the SQL limit was for days)
-    # The original API expects a flat list of games.
-    return results[:limit] if limit else results
+    with db_conn() as conn:
+        try:
+            with conn.cursor() as cursor:
+                if game_date:
+                    cursor.execute(_SQL_HISTORY_VERSION + " WHERE prediction_date = %s", (game_date,))
+                else:
+                    cursor.execute(_SQL_HISTORY_VERSION)
+                updated, days = cursor.fetchone()
+            return f"{updated.isoformat() if updated else '-'}:{days}"
+        except psycopg2.Error as e:
+            print(f"[Database] Error getting history version: {e}")
+            return None
+
+
+def get_history(limit: int = 100, game_date: Optional[str] = None,
+                include_ai: bool = True) -> List[Dict[str, Any]]:
+    """
+    Retrieve predictions as a flat list of games, newest day first.
+    Since we store by DAY, the 'games' arrays are unpacked and limited in SQL
+    (limit 0/None = no limit), so only the requested games cross the wire.
+    include_ai=False leaves each game's ai_impact out of the query.
+    The list is built inside the connection block, so the pooled connection
+    goes back as soon as the rows are read.
+    """
+    with db_conn() as conn:
+        try:
+            with conn.cursor() as cursor:
+                if game_date:
+                    sql = _SQL_HISTORY_BY_DATE if include_ai else _SQL_HISTORY_BY_DATE_LEAN
+                    cursor.execute(sql, (game_date, limit or None))
+                else:
+                    sql = _SQL_HISTORY_RECENT if include_ai else _SQL_HISTORY_RECENT_LEAN
+                    cursor.execute(sql, (limit or None,))
+                return [game for (game,) in cursor]
+        except Exception as e:
+            print(f"[Database] Error getting history: {e}")
+            return []
+
+
+# Defaults are merged under each game in SQL: jsonb_strip_nulls drops null
+# fields so the caller's default wins; non-null stored values win otherwise
+_SQL_GAMES_WITH_DEFAULTS = """
+    SELECT %s::jsonb || jsonb_strip_nulls(g.game) AS game FROM predictions p
+    CROSS JOIN LATERAL jsonb_array_elements(p.payload->'games') WITH ORDINALITY AS g(game, ord)
+    WHERE p.prediction_date = %s
+    ORDER BY g.ord
+"""
+
+
+def get_games_with_defaults(game_date: str, defaults: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """A day's stored games with missing/null fields filled from defaults (in SQL)."""
+    with db_conn() as conn:
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(_SQL_GAMES_WITH_DEFAULTS, (OJson(defaults), game_date))
+                return [game for (game,) in cursor]
+        except psycopg2.Error as e:
+            print(f"[Database] Error getting games for {game_date}: {e}")
+            return []
+
+
+_SQL_UPDATE_RESULTS_BULK = """
+    WITH scores AS (
+        SELECT * FROM jsonb_to_recordset(%s::jsonb) AS x(
+            home_team text, away_team text,
+            home_score int, away_score int, status text
+        )
+    ),
+    target AS (
+        SELECT id, payload FROM predictions
+        WHERE prediction_date = %s
+        FOR UPDATE
+    ),
+    games AS (
+        SELECT t.id, g.ord,
+               s.home_team IS NOT NULL AS matched,
+               -- Only games whose stored result differs are merged, counted and
+               -- written: re-auditing a settled day is a no-op (no updated_at bump)
+               s.home_team IS NOT NULL AND (
+                   g.game->'home_score' IS DISTINCT FROM n.fields->'home_score'
+                   OR g.game->'away_score' IS DISTINCT FROM n.fields->'away_score'
+                   OR g.game->'status' IS DISTINCT FROM n.fields->'status'
+                   OR g.game->'actual_winner' IS DISTINCT FROM n.fields->'actual_winner'
+                   OR g.game->'is_correct' IS DISTINCT FROM n.fields->'is_correct'
+               ) AS changed,
+               g.game, n.fields
+        FROM target t
+        CROSS JOIN LATERAL jsonb_array_elements(t.payload->'games')
+            WITH ORDINALITY AS g(game, ord)
+        LEFT JOIN scores s
+            ON s.home_team = g.game->>'home_team'
+           AND s.away_team = g.game->>'away_team'
+        CROSS JOIN LATERAL (
+            SELECT CASE WHEN s.home_score > s.away_score
+                        THEN s.home_team ELSE s.away_team END AS actual
+        ) w
+        CROSS JOIN LATERAL (
+            SELECT jsonb_build_object(
+                'home_score', s.home_score,
+                'away_score', s.away_score,
+                'status', s.status,
+                'actual_winner', w.actual,
+                'is_correct', CASE WHEN g.game->>'predicted_winner' = w.actual
+                                   THEN 1 ELSE 0 END
+            ) AS fields
+        ) n
+    ),
+    updated AS (
+        UPDATE predictions p
+        SET payload = jsonb_set(p.payload, '{games}', agg.games),
+            updated_at = CURRENT_TIMESTAMP
+        FROM (
+            SELECT id,
+                   jsonb_agg(CASE WHEN changed THEN game || fields ELSE game END
+                             ORDER BY ord) AS games
+            FROM games GROUP BY id
+            HAVING bool_or(changed)
+        ) agg
+        WHERE p.id = agg.id
+        RETURNING p.id
+    )
+    SELECT COUNT(*) FILTER (WHERE matched) AS matched,
+           COUNT(*) FILTER (WHERE changed) AS audited,
+           COUNT(*) FILTER (WHERE changed AND (fields->>'is_correct')::int = 1) AS correct
+    FROM games
+"""
+
+def update_prediction_results_bulk(game_date: str, results: List[Dict[str, Any]]) -> Dict[str, int]:
+    """
+    Write final scores for many games of one day in a single statement.
+
+    results: [{home_team, away_team, home_score, away_score, status}], with team
+    names exactly as stored in the payload. The games array is rebuilt in SQL
+    (order preserved) and the counts come back from the same statement:
+    matched = games found, audited/correct = games whose stored result changed
+    (the row is only rewritten when audited > 0).
+    """
+    if not results:
+        return {"matched": 0, "audited": 0, "correct": 0}
+
+    with db_conn() as conn:
+        try:
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute(_SQL_UPDATE_RESULTS_BULK, (OJson(results), game_date))
+                row = cursor.fetchone()
+            conn.commit()
+            if row["audited"]:
+                _invalidate_stats_cache()
+            return {"matched": row["matched"] or 0, "audited": row["audited"] or 0,
+                    "correct": row["correct"] or 0}
+        except Exception as e:
+            print(f"[Database] Error bulk updating results: {e}")
+            conn.rollback()
+            return {"matched": 0, "audited": 0, "correct": 0}
 
 
 def update_prediction_result(game_date: str, home_team: str, away_team: str, 
                              home_score: int, away_score: int, status: str) -> bool:
     """
     Update a specific game result inside the JSONB payload.
-    This is complex in JSONB but doable.
+    Single-game case of update_prediction_results_bulk (one server-side UPDATE).
     """
-    conn = get_connection()
-    try:
-        with conn.cursor() as cursor:
-            # We need to find the row for this date, read it, modify it, and save it back
-            # Or use fancy JSONB set operations.
-            
-            # 1. Fetch
-            cursor.execute("SELECT payload FROM predictions WHERE prediction_date = %s", (game_date,))
-            row = cursor.fetchone()
-            if not row:
-                return False
-            
-            payload = row[0] # RealDictCursor not used here unless specified, assuming standard cursor or handled above
-            # Note: If I didn't use cursor_factory in this function, tuple access.
-            # Let's use standard cursor for this function or be consistent. 
-            pass
-            
-            # Simpler approach: Read logic with RealDictCursor
-    except:
-        pass
-        
-    # Re-implementing correctly below
-    return _update_prediction_result_impl(game_date, home_team, away_team, home_score, away_score, status)
+    stats = update_prediction_results_bulk(game_date, [{
+        "home_team": home_team,
+        "away_team": away_team,
+        "home_score": home_score,
+        "away_score": away_score,
+        "status": status
+    }])
+    return stats["matched"] > 0  # an unchanged result is still a successful set
+
+
+_SQL_STATS = """
+    SELECT COALESCE(SUM(games_total), 0) AS total,
+           COALESCE(SUM(games_completed), 0) AS completed,
+           COALESCE(SUM(games_correct), 0) AS correct
+    FROM predictions;
+"""
+
+
+# Stats only change when predictions/results are written; cache them briefly
+STATS_CACHE_TTL = 60  # seconds
+_stats_cache = TTLCache(maxsize=1, ttl=STATS_CACHE_TTL)
+_stats_cache_lock = threading.Lock()
+
+
+def _invalidate_stats_cache():
+    with _stats_cache_lock:
+        _stats_cache.clear()
+
+
+def _stats_from_row(row) -> Dict[str, Any]:
+    total = int(row["total"] or 0)
+    completed = int(row["completed"] or 0)
+    correct = int(row["correct"] or 0)
+    stats = {
+        "total_predictions": total,
+        "completed_games": completed,
+        "correct_predictions": correct,
+        "win_rate": round(correct / completed * 100, 1) if completed else 0.0,
+        "pending_games": total - completed
+    }
+    with _stats_cache_lock:
+        _stats_cache["stats"] = stats
+    return dict(stats)
+
+
+def _cached_stats() -> Optional[Dict[str, Any]]:
+    with _stats_cache_lock:
+        stats = _stats_cache.get("stats")
+    return dict(stats) if stats is not None else None
 
-def _update_prediction_result_impl(game_date, home_team, away_team, home_score, away_score, status):
-    conn = get_connection()
-    try:
-        with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-            cursor.execute("SELECT id, payload FROM predictions WHERE prediction_date = %s", (game_date,))
-            row = cursor.fetchone()
-            if not row:
-                return False
-            
-            record_id = row['id']
-            payload = row['payload']
-            games = payload.get('games', [])
-            
-            updated = False
-            for game in games:
-                if game.get('home_team') == home_team and game.get('away_team') == away_team:
-                    game['home_score'] = home_score
-                    game['away_score'] = away_score
-                    game['status'] = status
-                    
-                    # Determine winner
-                    if home_score > away_score:
-                        actual = home_team
-                    else:
-                        actual = away_team
-                    
-                    game['actual_winner'] = actual
-                    game['is_correct'] = 1 if game.get('predicted_winner') == actual else 0
-                    updated = True
-                    break
-            
-            if updated:
-                cursor.execute("""
-                    UPDATE predictions 
-                    SET payload = %s 
-                    WHERE id = %s
-                """, (Json(payload), record_id))
-                conn.commit()
-                return True
-            return False
-    except Exception as e:
-        print(f"[Database] Error updating result: {e}")
-        conn.rollback()
-        return False
-    finally:
-        conn.close()
 
 def get_stats() -> Dict[str, Any]:
     """
-    Get generic stats. Expensive with JSONB iteration, but functional.
+    Get prediction stats in a single pass over every stored game.
     """
-    # For now, return mock/zeros or implement efficient JSONB aggregation query
-    # Implementing a simple aggregation
-    conn = get_connection()
-    try:
-        with conn.cursor() as cursor:
-            # Count total games in all payloads
-            cursor.execute("""
-                SELECT sum(jsonb_array_length(payload->'games')) FROM predictions;
-            """)
-            total = cursor.fetchone()[0] or 0
-            
-            # This is hard to query efficiently without advanced JSONB path operators.
-            # We'll return basic counts.
-            return {
-                "total_predictions": int(total),
-                "completed_games": 0,
-                "correct_predictions": 0,
-                "win_rate": 0.0,
-                "pending_games": 0
-            }
-    except:
-        return {"total_predictions": 0, "completed_games": 0, "correct_predictions": 0, "win_rate": 0.0, "pending_games": 0}
-    finally:
-        conn.close()
+    cached = _cached_stats()
+    if cached is not None:
+        return cached
+
+    empty = {"total_predictions": 0, "completed_games": 0, "correct_predictions": 0, "win_rate": 0.0, "pending_games": 0}
+    with db_conn() as conn:
+        try:
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute(_SQL_STATS)
+                row = cursor.fetchone()
+            return _stats_from_row(row)
+        except psycopg2.Error as e:
+            print(f"[Database] Error getting stats: {e}")
+            return empty
 
 
 # ============================================================
 # AI Insights (PostgreSQL)
 # ============================================================
 
+# In-process TTL cache in front of the insight readers. The predictor reads
+# the same (team, date) pairs on every request; the worker writes rarely.
+INSIGHT_CACHE_TTL = 300  # seconds
+_insight_cache = TTLCache(maxsize=1024, ttl=INSIGHT_CACHE_TTL)          # (team, date) -> insight | None
+_insights_by_date_cache = TTLCache(maxsize=64, ttl=INSIGHT_CACHE_TTL)   # date -> {team: insight}
+_insight_cache_lock = threading.RLock()
+
+
+def _invalidate_insight_cache(team_name: str, game_date: str):
+    with _insight_cache_lock:
+        _insight_cache.pop((team_name, str(game_date)), None)
+        _insights_by_date_cache.pop(str(game_date), None)
+
+
+_SQL_UPSERT_AI_INSIGHT = """
+    INSERT INTO ai_insights (
+        team_name, game_date, summary, impact_score, 
+        key_factors, confidence, created_at, expires_at
+    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+    ON CONFLICT (team_name, game_date)
+    DO UPDATE SET 
+        summary = EXCLUDED.summary,
+        impact_score = EXCLUDED.impact_score,
+        key_factors = EXCLUDED.key_factors,
+        confidence = EXCLUDED.confidence,
+        expires_at = EXCLUDED.expires_at;
+"""
+
 def save_ai_insight(team_name: str, game_date: str, insight: Dict[str, Any]) -> bool:
-    conn = get_connection()
-    try:
-        now = datetime.now()
-        expires = now + timedelta(hours=6)
+    with db_conn() as conn:
+        try:
+            now = datetime.now()
+            expires = now + timedelta(hours=6)
         
-        with conn.cursor() as cursor:
-            cursor.execute("""
-                INSERT INTO ai_insights (
-                    team_name, game_date, summary, impact_score, 
-                    key_factors, confidence, created_at, expires_at
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                ON CONFLICT (team_name, game_date)
-                DO UPDATE SET 
-                    summary = EXCLUDED.summary,
-                    impact_score = EXCLUDED.impact_score,
-                    key_factors = EXCLUDED.key_factors,
-                    confidence = EXCLUDED.confidence,
-                    expires_at = EXCLUDED.expires_at;
-            """, (
-                team_name,
-                game_date,
-                insight.get("summary", ""),
-                insight.get("impact_score", 0.0),
-                Json(insight.get("key_factors", [])),
-                insight.get("confidence", 0),
-                now,
-                expires
-            ))
-        conn.commit()
-        return True
-    except Exception as e:
-        print(f"[Database] Error saving AI insight: {e}")
-        return False
-    finally:
-        conn.close()
+            with conn.cursor() as cursor:
+                cursor.execute(_SQL_UPSERT_AI_INSIGHT, (
+                    team_name,
+                    game_date,
+                    insight.get("summary", ""),
+                    insight.get("impact_score", 0.0),
+                    OJson(insight.get("key_factors", [])),
+                    insight.get("confidence", 0),
+                    now,
+                    expires
+                ))
+            conn.commit()
+            _invalidate_insight_cache(team_name, game_date)
+            return True
+        except Exception as e:
+            print(f"[Database] Error saving AI insight: {e}")
+            return False
 
 def get_ai_insight(team_name: str, game_date: str) -> Optional[Dict[str, Any]]:
-    conn = get_connection()
-    try:
-        with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-            cursor.execute("""
-                SELECT summary, impact_score, key_factors, confidence, expires_at
-                FROM ai_insights
-                WHERE team_name = %s AND game_date = %s
-            """, (team_name, game_date))
-            row = cursor.fetchone()
+    cache_key = (team_name, str(game_date))
+    with _insight_cache_lock:
+        if cache_key in _insight_cache:
+            return _insight_cache[cache_key]
+
+    with db_conn() as conn:
+        try:
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute("""
+                    SELECT summary, impact_score, key_factors, confidence
+                    FROM ai_insights
+                    WHERE team_name = %s AND game_date = %s AND expires_at > NOW()
+                """, (team_name, game_date))
+                row = cursor.fetchone()
             
-            if not row: 
-                return None
-                
-            # Check expiry (Postgres returns datetime objects)
-            if datetime.now().astimezone() > row['expires_at'].astimezone():
-                return None
-                
-            return {
-                "summary": row["summary"],
-                "impact_score": row["impact_score"],
-                "key_factors": row["key_factors"], # asyncpg/psycopg2 might auto-decode JSON
-                "confidence": row["confidence"]
-            }
-    except Exception as e:
-        print(f"[Database] Error getting AI insight: {e}")
-        return None
-    finally:
-        conn.close()
+            insight = None
+            if row:
+                insight = {
+                    "summary": row["summary"],
+                    "impact_score": row["impact_score"],
+                    "key_factors": row["key_factors"], # already a list (JSONB typecaster)
+                    "confidence": row["confidence"]
+                }
+        except Exception as e:
+            print(f"[Database] Error getting AI insight: {e}")
+            return None
+
+    # Misses are cached too; save_ai_insight invalidates the entry
+    with _insight_cache_lock:
+        _insight_cache[cache_key] = insight
+    return insight
 
 
 def get_insights_for_date(game_date: str) -> Dict[str, Dict[str, Any]]:
@@ -432,33 +734,80 @@ def get_insights_for_date(game_date: str) -> Dict[str, Dict[str, Any]]:
     Get all cached AI insights for a specific game date.
     Returns dict keyed by team_name.
     """
-    conn = get_connection()
-    try:
-        with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-            cursor.execute("""
-                SELECT team_name, summary, impact_score, key_factors, confidence, expires_at
-                FROM ai_insights
-                WHERE game_date = %s
-            """, (game_date,))
+    cache_key = str(game_date)
+    with _insight_cache_lock:
+        if cache_key in _insights_by_date_cache:
+            return dict(_insights_by_date_cache[cache_key])
+
+    with db_conn() as conn:
+        try:
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute("""
+                    SELECT team_name, summary, impact_score, key_factors, confidence
+                    FROM ai_insights
+                    WHERE game_date = %s AND expires_at > NOW()
+                """, (game_date,))
             
-            rows = cursor.fetchall()
+                rows = cursor.fetchall()
             
             insights = {}
             for row in rows:
-                # Check expiry
-                if datetime.now().astimezone() <= row['expires_at'].astimezone():
-                    insights[row['team_name']] = {
+                insights[row['team_name']] = {
+                    "summary": row["summary"],
+                    "impact_score": row["impact_score"],
+                    "key_factors": row["key_factors"],
+                    "confidence": row["confidence"]
+                }
+        except Exception as e:
+            print(f"[Database] Error getting insights for date: {e}")
+            return {}
+
+    with _insight_cache_lock:
+        _insights_by_date_cache[cache_key] = insights
+    return dict(insights)
+
+
+def get_insights_for_dates(game_dates: List[str]) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """
+    Get cached AI insights for several game dates in one round-trip.
+    Returns {date: {team_name: insight}}; dates without insights map to {}.
+    """
+    keys = [str(d) for d in game_dates]
+    result: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    with _insight_cache_lock:
+        for key in keys:
+            if key in _insights_by_date_cache:
+                result[key] = dict(_insights_by_date_cache[key])
+    missing = [key for key in keys if key not in result]
+    if not missing:
+        return result
+
+    fetched: Dict[str, Dict[str, Dict[str, Any]]] = {key: {} for key in missing}
+    with db_conn() as conn:
+        try:
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute("""
+                    SELECT game_date, team_name, summary, impact_score, key_factors, confidence
+                    FROM ai_insights
+                    WHERE game_date = ANY(%s::date[]) AND expires_at > NOW()
+                """, (missing,))
+
+                for row in cursor:
+                    fetched[str(row["game_date"])][row["team_name"]] = {
                         "summary": row["summary"],
                         "impact_score": row["impact_score"],
                         "key_factors": row["key_factors"],
                         "confidence": row["confidence"]
                     }
-            return insights
-    except Exception as e:
-        print(f"[Database] Error getting insights for date: {e}")
-        return {}
-    finally:
-        conn.close()
+        except Exception as e:
+            print(f"[Database] Error getting insights for dates: {e}")
+            return result
+
+    with _insight_cache_lock:
+        for key, insights in fetched.items():
+            _insights_by_date_cache[key] = insights
+            result[key] = dict(insights)
+    return result
 
 
 # ============================================================
@@ -466,176 +815,386 @@ def get_insights_for_date(game_date: str) -> Dict[str, Dict[str, Any]]:
 # ============================================================
 from .models import BetLedger, PortfolioSnapshot
 
+_SQL_INSERT_BETS = """
+    INSERT INTO bet_ledger (
+        prediction_id, date, match, selection, odds, 
+        stake_amount, status, pnl, is_real_bet, created_at
+    ) VALUES %s
+    RETURNING id;
+"""
+
+def log_bets_bulk(bets: List[BetLedger]) -> List[int]:
+    """
+    Insert many bets (e.g. a whole proposed portfolio) in one statement.
+    Returns the new ids.
+    """
+    if not bets:
+        return []
+    rows = [
+        (bet.prediction_id, bet.date, bet.match, bet.selection, bet.odds,
+         bet.stake_amount, bet.status, bet.pnl, bet.is_real_bet)
+        for bet in bets
+    ]
+    with db_conn() as conn:
+        try:
+            with conn.cursor() as cursor:
+                inserted = execute_values(
+                    cursor, _SQL_INSERT_BETS, rows,
+                    template="(%s, %s, %s, %s, %s, %s, %s, %s, %s, CURRENT_TIMESTAMP)",
+                    fetch=True
+                )
+                conn.commit()
+                return [r[0] for r in inserted]
+        except Exception as e:
+            print(f"[Database] Error logging bets: {e}")
+            conn.rollback()
+            return []
+
 def log_bet(bet: BetLedger) -> Optional[int]:
     """
-    Log a new bet or update existing one in the ledger.
+    Log a new bet in the ledger.
     """
-    conn = get_connection()
-    try:
-        with conn.cursor() as cursor:
-            cursor.execute("""
-                INSERT INTO bet_ledger (
-                    prediction_id, date, match, selection, odds, 
-                    stake_amount, status, pnl, is_real_bet, created_at
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, CURRENT_TIMESTAMP)
-                RETURNING id;
-            """, (
-                bet.prediction_id, bet.date, bet.match, bet.selection,
-                bet.odds, bet.stake_amount, bet.status, bet.pnl, bet.is_real_bet
-            ))
-            new_id = cursor.fetchone()[0]
-            conn.commit()
-            return new_id
-    except Exception as e:
-        print(f"[Database] Error logging bet: {e}")
-        conn.rollback()
-        return None
-    finally:
-        conn.close()
+    ids = log_bets_bulk([bet])
+    return ids[0] if ids else None
 
 def get_pending_bets() -> List[Dict[str, Any]]:
-    conn = get_connection()
-    try:
-        with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-            cursor.execute("""
-                SELECT * FROM bet_ledger WHERE status = 'PENDING'
-            """)
-            return cursor.fetchall()
-    except Exception as e:
-        print(f"[Database] Error fetching pending bets: {e}")
-        return []
-    finally:
-        conn.close()
+    with db_conn() as conn:
+        try:
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute("""
+                    SELECT id, prediction_id, date, match, selection, odds, stake_amount, is_real_bet
+                    FROM bet_ledger WHERE status = 'PENDING'
+                """)
+                return cursor.fetchall()
+        except Exception as e:
+            print(f"[Database] Error fetching pending bets: {e}")
+            return []
 
 def update_bet_status(bet_id: int, status: str, pnl: float) -> bool:
-    conn = get_connection()
-    try:
-        with conn.cursor() as cursor:
-            cursor.execute("""
-                UPDATE bet_ledger 
-                SET status = %s, pnl = %s 
-                WHERE id = %s
-            """, (status, pnl, bet_id))
-            conn.commit()
-            return True
-    except Exception as e:
-        print(f"[Database] Error updating bet status: {e}")
-        conn.rollback()
-        return False
-    finally:
-        conn.close()
+    with db_conn() as conn:
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    UPDATE bet_ledger 
+                    SET status = %s, pnl = %s 
+                    WHERE id = %s
+                """, (status, pnl, bet_id))
+                conn.commit()
+                return True
+        except Exception as e:
+            print(f"[Database] Error updating bet status: {e}")
+            conn.rollback()
+            return False
+
+def update_bet_statuses_bulk(updates: List[Tuple[int, str, float]]) -> int:
+    """
+    Settle many bets in one statement. updates: [(bet_id, status, pnl), ...]
+    Returns the number of rows updated.
+    """
+    if not updates:
+        return 0
+    with db_conn() as conn:
+        try:
+            with conn.cursor() as cursor:
+                execute_values(cursor, """
+                    UPDATE bet_ledger
+                    SET status = v.status, pnl = v.pnl
+                    FROM (VALUES %s) AS v(id, status, pnl)
+                    WHERE bet_ledger.id = v.id
+                """, updates, template="(%s::int, %s::text, %s::real)",
+                   page_size=len(updates))  # one page, so rowcount covers every row
+                updated = cursor.rowcount
+                conn.commit()
+                return updated
+        except Exception as e:
+            print(f"[Database] Error bulk updating bet status: {e}")
+            conn.rollback()
+            return 0
 
 def save_portfolio_snapshot(snapshot: PortfolioSnapshot) -> bool:
-    conn = get_connection()
-    try:
-        with conn.cursor() as cursor:
-            cursor.execute("""
-                INSERT INTO portfolio_history (
-                    date, total_balance, daily_profit, roi_percentage, created_at
-                ) VALUES (%s, %s, %s, %s, CURRENT_TIMESTAMP)
-                ON CONFLICT (date) DO UPDATE SET
-                    total_balance = EXCLUDED.total_balance,
-                    daily_profit = EXCLUDED.daily_profit,
-                    roi_percentage = EXCLUDED.roi_percentage,
-                    created_at = CURRENT_TIMESTAMP;
-            """, (snapshot.date, snapshot.total_balance, snapshot.daily_profit, snapshot.roi_percentage))
-            conn.commit()
-            return True
-    except Exception as e:
-        print(f"[Database] Error saving portfolio snapshot: {e}")
-        conn.rollback()
-        return False
-    finally:
-        conn.close()
+    with db_conn() as conn:
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    INSERT INTO portfolio_history (
+                        date, total_balance, daily_profit, roi_percentage, created_at
+                    ) VALUES (%s, %s, %s, %s, CURRENT_TIMESTAMP)
+                    ON CONFLICT (date) DO UPDATE SET
+                        total_balance = EXCLUDED.total_balance,
+                        daily_profit = EXCLUDED.daily_profit,
+                        roi_percentage = EXCLUDED.roi_percentage,
+                        created_at = CURRENT_TIMESTAMP;
+                """, (snapshot.date, snapshot.total_balance, snapshot.daily_profit, snapshot.roi_percentage))
+                conn.commit()
+                return True
+        except Exception as e:
+            print(f"[Database] Error saving portfolio snapshot: {e}")
+            conn.rollback()
+            return False
 
 def get_portfolio_history(limit: int = 30) -> List[Dict[str, Any]]:
-    conn = get_connection()
-    try:
-        with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-            cursor.execute("""
-                SELECT * FROM portfolio_history 
-                ORDER BY date ASC 
-                LIMIT %s
-            """, (limit,))
-            return cursor.fetchall()
-    except Exception as e:
-        print(f"[Database] Error getting portfolio history: {e}")
-        return []
-    finally:
-        conn.close()
+    with db_conn() as conn:
+        try:
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute("""
+                    SELECT * FROM portfolio_history 
+                    ORDER BY date ASC 
+                    LIMIT %s
+                """, (limit,))
+                return cursor.fetchall()
+        except Exception as e:
+            print(f"[Database] Error getting portfolio history: {e}")
+            return []
 
 # ============================================================
 # Daily Cache (Autonomous Entity Layer)
 # ============================================================
 
+# Short in-process cache in front of get_daily_cache: /api/strategy/optimize
+# reads today's row on every call, while the worker writes it twice a day.
+# save_daily_cache evicts the date, so only out-of-process writers wait on the TTL.
+DAILY_CACHE_TTL = 30  # seconds
+_daily_cache_rows = TTLCache(maxsize=8, ttl=DAILY_CACHE_TTL)  # date -> row
+_daily_cache_lock = threading.Lock()
+
+
 def get_daily_cache(entry_date: str) -> Optional[Dict[str, Any]]:
     """
     Get cached predictions and strategy for a specific date.
+    The returned row is shared with the in-process cache; do not mutate it.
     """
-    conn = get_connection()
-    try:
-        with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-            cursor.execute("""
-                SELECT * FROM daily_cache WHERE cache_date = %s
-            """, (entry_date,))
-            return cursor.fetchone()
-    except Exception as e:
-        print(f"[Database] Error getting daily cache: {e}")
-        return None
-    finally:
-        conn.close()
+    cache_key = str(entry_date)
+    with _daily_cache_lock:
+        if cache_key in _daily_cache_rows:
+            return _daily_cache_rows[cache_key]
+
+    with db_conn() as conn:
+        try:
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute("""
+                    SELECT * FROM daily_cache WHERE cache_date = %s
+                """, (entry_date,))
+                row = cursor.fetchone()
+        except Exception as e:
+            print(f"[Database] Error getting daily cache: {e}")
+            return None
+
+    # Misses aren't cached: the caller computes and saves right after
+    if row is not None:
+        with _daily_cache_lock:
+            _daily_cache_rows[cache_key] = row
+    return row
+
+
+_SQL_UPSERT_DAILY_CACHE = """
+    INSERT INTO daily_cache (cache_date, predictions_json, strategy_json, sentinel_message, created_at)
+    VALUES (%s, %s, %s, %s, CURRENT_TIMESTAMP)
+    ON CONFLICT (cache_date) DO UPDATE SET
+        predictions_json = COALESCE(EXCLUDED.predictions_json, daily_cache.predictions_json),
+        strategy_json = COALESCE(EXCLUDED.strategy_json, daily_cache.strategy_json),
+        sentinel_message = COALESCE(EXCLUDED.sentinel_message, daily_cache.sentinel_message),
+        updated_at = CURRENT_TIMESTAMP;
+"""
 
 def save_daily_cache(entry_date: str, predictions: Optional[List] = None, 
                      strategy: Optional[Dict] = None, sentinel_msg: Optional[str] = None):
     """
-    Upsert daily cache. Only updates provided fields.
+    Upsert daily cache. Only updates provided fields (None keeps the stored value).
     """
-    conn = get_connection()
-    try:
-        with conn.cursor() as cursor:
-            # Check if exists
-            cursor.execute("SELECT id FROM daily_cache WHERE cache_date = %s", (entry_date,))
-            exists = cursor.fetchone()
-            
-            if not exists:
-                cursor.execute("""
-                    INSERT INTO daily_cache (cache_date, predictions_json, strategy_json, sentinel_message, created_at)
-                    VALUES (%s, %s, %s, %s, CURRENT_TIMESTAMP)
-                """, (
+    with db_conn() as conn:
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(_SQL_UPSERT_DAILY_CACHE, (
                     entry_date, 
-                    Json(predictions) if predictions is not None else None,
-                    Json(strategy) if strategy is not None else None,
+                    OJson(predictions) if predictions is not None else None,
+                    OJson(strategy) if strategy is not None else None,
                     sentinel_msg
                 ))
-            else:
-                # Build dynamic update
-                updates = []
-                params = []
-                
-                if predictions is not None:
-                    updates.append("predictions_json = %s")
-                    params.append(Json(predictions))
-                
-                if strategy is not None:
-                    updates.append("strategy_json = %s")
-                    params.append(Json(strategy))
-                    
-                if sentinel_msg is not None:
-                    updates.append("sentinel_message = %s")
-                    params.append(sentinel_msg)
-                
-                if updates:
-                    updates.append("updated_at = CURRENT_TIMESTAMP")
-                    query = f"UPDATE daily_cache SET {', '.join(updates)} WHERE cache_date = %s"
-                    params.append(entry_date)
-                    cursor.execute(query, tuple(params))
-            
-            conn.commit()
+                conn.commit()
+            with _daily_cache_lock:
+                _daily_cache_rows.pop(str(entry_date), None)
             return True
             
+        except Exception as e:
+            print(f"[Database] Error saving daily cache: {e}")
+            conn.rollback()
+            return False
+
+
+# ============================================================
+# Async read path (asyncpg) for the API's async endpoints
+# ============================================================
+
+import asyncio
+from datetime import date
+
+try:
+    import asyncpg
+    ASYNCPG_AVAILABLE = True
+except ImportError:
+    asyncpg = None
+    ASYNCPG_AVAILABLE = False
+
+_async_pool = None
+
+# asyncpg uses $n placeholders; same statements as _SQL_HISTORY_*
+def _to_asyncpg(sql: str) -> str:
+    n = 0
+    while "%s" in sql:
+        n += 1
+        sql = sql.replace("%s", f"${n}", 1)
+    return sql
+
+
+_ASQL_HISTORY_RECENT = _to_asyncpg(_SQL_HISTORY_RECENT)
+_ASQL_HISTORY_BY_DATE = _to_asyncpg(_SQL_HISTORY_BY_DATE)
+_ASQL_HISTORY_RECENT_LEAN = _to_asyncpg(_SQL_HISTORY_RECENT_LEAN)
+_ASQL_HISTORY_BY_DATE_LEAN = _to_asyncpg(_SQL_HISTORY_BY_DATE_LEAN)
+_ASQL_GAMES_WITH_DEFAULTS = _to_asyncpg(_SQL_GAMES_WITH_DEFAULTS)
+
+
+async def _init_async_conn(conn):
+    # Same orjson-backed JSONB decoding as the psycopg2 path
+    await conn.set_type_codec(
+        "jsonb", schema="pg_catalog",
+        encoder=lambda v: orjson.dumps(v).decode(), decoder=orjson.loads
+    )
+
+
+async def init_async_pool():
+    """Create the asyncpg pool (API startup). No-op if asyncpg is not installed."""
+    global _async_pool
+    if not ASYNCPG_AVAILABLE or not DATABASE_URL or _async_pool is not None:
+        return
+    try:
+        _async_pool = await asyncpg.create_pool(
+            DATABASE_URL, min_size=POOL_MIN_CONN, max_size=POOL_MAX_CONN, init=_init_async_conn
+        )
+        print(f"[Database] Async pool ready ({POOL_MIN_CONN}-{POOL_MAX_CONN})")
     except Exception as e:
-        print(f"[Database] Error saving daily cache: {e}")
-        conn.rollback()
-        return False
-    finally:
-        conn.close()
+        # Async readers fall back to the psycopg2 pool
+        print(f"[Database] Async pool unavailable: {e}")
+        _async_pool = None
+
+async def close_async_pool():
+    global _async_pool
+    if _async_pool is not None:
+        await _async_pool.close()
+        _async_pool = None
+
+async def get_history_async(limit: int = 100, game_date: Optional[str] = None,
+                            include_ai: bool = True) -> List[Dict[str, Any]]:
+    """
+    Async get_history. Falls back to the sync version in a worker thread
+    when the asyncpg pool is not available.
+    """
+    if _async_pool is None:
+        return await asyncio.to_thread(get_history, limit, game_date, include_ai)
+
+    try:
+        async with _async_pool.acquire() as conn:
+            if game_date:
+                sql = _ASQL_HISTORY_BY_DATE if include_ai else _ASQL_HISTORY_BY_DATE_LEAN
+                rows = await conn.fetch(sql, date.fromisoformat(game_date), limit or None)
+            else:
+                sql = _ASQL_HISTORY_RECENT if include_ai else _ASQL_HISTORY_RECENT_LEAN
+                rows = await conn.fetch(sql, limit or None)
+        return [row["game"] for row in rows]
+    except Exception as e:
+        print(f"[Database] Error getting history (async): {e}")
+        return []
+
+
+HISTORY_STREAM_PREFETCH = 200  # rows per cursor round-trip when streaming
+
+
+async def iter_history_async(limit: int = 100, game_date: Optional[str] = None,
+                             include_ai: bool = True) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Stream stored games through a server-side cursor (O(prefetch) memory).
+    Without the asyncpg pool, falls back to a buffered get_history_async.
+    """
+    if _async_pool is None:
+        for game in await get_history_async(limit, game_date, include_ai):
+            yield game
+        return
+
+    try:
+        async with _async_pool.acquire() as conn:
+            # asyncpg cursors only live inside a transaction
+            async with conn.transaction():
+                if game_date:
+                    sql = _ASQL_HISTORY_BY_DATE if include_ai else _ASQL_HISTORY_BY_DATE_LEAN
+                    args = (date.fromisoformat(game_date), limit or None)
+                else:
+                    sql = _ASQL_HISTORY_RECENT if include_ai else _ASQL_HISTORY_RECENT_LEAN
+                    args = (limit or None,)
+                async for row in conn.cursor(sql, *args, prefetch=HISTORY_STREAM_PREFETCH):
+                    yield row["game"]
+    except Exception as e:
+        print(f"[Database] Error streaming history (async): {e}")
+
+
+async def get_games_with_defaults_async(game_date: str, defaults: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Async get_games_with_defaults (sync fallback in a worker thread)."""
+    if _async_pool is None:
+        return await asyncio.to_thread(get_games_with_defaults, game_date, defaults)
+
+    try:
+        async with _async_pool.acquire() as conn:
+            rows = await conn.fetch(_ASQL_GAMES_WITH_DEFAULTS, defaults, date.fromisoformat(game_date))
+        return [row["game"] for row in rows]
+    except Exception as e:
+        print(f"[Database] Error getting games for {game_date} (async): {e}")
+        return []
+
+
+async def get_portfolio_history_async(limit: int = 30) -> List[Dict[str, Any]]:
+    """Async get_portfolio_history (sync fallback in a worker thread)."""
+    if _async_pool is None:
+        return await asyncio.to_thread(get_portfolio_history, limit)
+
+    try:
+        async with _async_pool.acquire() as conn:
+            rows = await conn.fetch("SELECT * FROM portfolio_history ORDER BY date ASC LIMIT $1", limit)
+        return [dict(row) for row in rows]
+    except Exception as e:
+        print(f"[Database] Error getting portfolio history (async): {e}")
+        return []
+
+
+async def get_history_version_async(game_date: Optional[str] = None) -> Optional[str]:
+    """Async get_history_version (sync fallback in a worker thread)."""
+    if _async_pool is None:
+        return await asyncio.to_thread(get_history_version, game_date)
+
+    try:
+        async with _async_pool.acquire() as conn:
+            if game_date:
+                row = await conn.fetchrow(_SQL_HISTORY_VERSION + " WHERE prediction_date = $1",
+                                          date.fromisoformat(game_date))
+            else:
+                row = await conn.fetchrow(_SQL_HISTORY_VERSION)
+        updated = row["updated"]
+        return f"{updated.isoformat() if updated else '-'}:{row['days']}"
+    except Exception as e:
+        print(f"[Database] Error getting history version (async): {e}")
+        return None
+
+
+async def get_stats_async() -> Dict[str, Any]:
+    """Async get_stats (sync fallback in a worker thread)."""
+    cached = _cached_stats()
+    if cached is not None:
+        return cached
+
+    if _async_pool is None:
+        return await asyncio.to_thread(get_stats)
+
+    try:
+        async with _async_pool.acquire() as conn:
+            row = await conn.fetchrow(_SQL_STATS)
+        return _stats_from_row(row)
+    except Exception as e:
+        print(f"[Database] Error getting stats (async): {e}")
+        return {"total_predictions": 0, "completed_games": 0, "correct_predictions": 0, "win_rate": 0.0, "pending_games": 0}
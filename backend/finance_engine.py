@@ -7,6 +7,7 @@ This module handles:
 3. Portfolio Optimization
 """
 
+import numpy as np
 from typing import List, Dict, Any, Tuple
 from datetime import datetime
 from .models import PredictionGame, BetLedger
@@ -52,67 +53,59 @@ def calculate_kelly_bet(win_prob: float, odds: float, bankroll: float, kelly_fra
 def sniper_check(win_prob: float, odds: float) -> Tuple[bool, float]:
     """
     Determines if a bet meets the 'Sniper' criteria.
-    Returns (Passed, Edge)
+    Returns (Passed, Edge); edge is reported as 0.0 when the odds alone reject the bet.
     """
-    if odds <= 1:
+    # Cheapest disqualifier first (also covers odds <= 1)
+    if odds <= MIN_ODDS:
         return False, 0.0
         
     implied_prob = 1 / odds
     edge = win_prob - implied_prob
     
-    pass_edge = edge > MIN_EDGE
-    pass_odds = odds > MIN_ODDS
-    
-    return (pass_edge and pass_odds), edge
+    return edge > MIN_EDGE, edge
 
 def optimize_portfolio(predictions: List[Dict[str, Any]], bankroll: float) -> List[BetLedger]:
     """
     Takes a list of raw prediction dicts (or models), applies filters,
     and returns a list of proposed Bets (BetLedger objects).
+
+    The whole slate is scored at once with NumPy (same math as sniper_check and
+    calculate_kelly_bet); only bets that pass build BetLedger objects.
     """
+    if not predictions:
+        return []
+
+    # Row 2*i is the home side of predictions[i], row 2*i + 1 the away side
+    odds = np.array(
+        [x for pred in predictions for x in (pred.get('home_odds', 0), pred.get('away_odds', 0))],
+        dtype=float
+    )
+    probs = np.array(
+        [x for pred in predictions for x in (pred.get('home_win_probability', 50), pred.get('away_win_probability', 50))],
+        dtype=float
+    ) / 100.0
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        b = odds - 1
+        edge = probs - 1 / odds
+        f_star = (probs * b - (1.0 - probs)) / b
+        stakes = np.minimum(bankroll * f_star * KELLY_FRACTION, bankroll * MAX_STAKE_PERCENT)
+
+    mask = (odds > 1) & (edge > MIN_EDGE) & (odds > MIN_ODDS) & (f_star > 0) & (stakes > 0)
+
     proposed_bets = []
-    
-    for pred in predictions:
-        # Check Home Bet
-        home_odds = pred.get('home_odds', 0)
-        home_prob = pred.get('home_win_probability', 50) / 100.0
-        
-        is_sniper, edge = sniper_check(home_prob, home_odds)
-        
-        if is_sniper:
-            stake = calculate_kelly_bet(home_prob, home_odds, bankroll)
-            if stake > 0:
-                bet = BetLedger(
-                    prediction_id=pred.get('game_id', f"{pred.get('home_team')} vs {pred.get('away_team')}"),
-                    date=pred.get('start_time_utc', datetime.now().isoformat())[:10],
-                    match=f"{pred.get('home_team')} vs {pred.get('away_team')}",
-                    selection=pred.get('home_team'), # Betting on Home
-                    odds=home_odds,
-                    stake_amount=round(stake, 2),
-                    status="PENDING",
-                    is_real_bet=False # Proposal
-                )
-                proposed_bets.append(bet)
-                
-        # Check Away Bet
-        away_odds = pred.get('away_odds', 0)
-        away_prob = pred.get('away_win_probability', 50) / 100.0
-        
-        is_sniper_a, edge_a = sniper_check(away_prob, away_odds)
-        
-        if is_sniper_a:
-            stake = calculate_kelly_bet(away_prob, away_odds, bankroll)
-            if stake > 0:
-                bet = BetLedger(
-                    prediction_id=pred.get('game_id', f"{pred.get('home_team')} vs {pred.get('away_team')}"),
-                    date=pred.get('start_time_utc', datetime.now().isoformat())[:10],
-                    match=f"{pred.get('home_team')} vs {pred.get('away_team')}",
-                    selection=pred.get('away_team'), # Betting on Away
-                    odds=away_odds,
-                    stake_amount=round(stake, 2),
-                    status="PENDING",
-                    is_real_bet=False
-                )
-                proposed_bets.append(bet)
+    for row in np.flatnonzero(mask):
+        pred = predictions[row // 2]
+        is_home = row % 2 == 0
+        proposed_bets.append(BetLedger(
+            prediction_id=pred.get('game_id', f"{pred.get('home_team')} vs {pred.get('away_team')}"),
+            date=pred.get('start_time_utc', datetime.now().isoformat())[:10],
+            match=f"{pred.get('home_team')} vs {pred.get('away_team')}",
+            selection=pred.get('home_team') if is_home else pred.get('away_team'),
+            odds=pred.get('home_odds', 0) if is_home else pred.get('away_odds', 0),
+            stake_amount=round(float(stakes[row]), 2),
+            status="PENDING",
+            is_real_bet=False # Proposal
+        ))
                 
     return proposed_bets
@@ -5,38 +5,104 @@ Exposes NBA predictions via REST API for mobile app consumption.
 """
 
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, HTTPException, Query, BackgroundTasks
+import asyncio
+import hashlib
+import logging
+import logging.handlers
+import os
+import queue
+import re
+import time
+import traceback
+import numpy as np
+import orjson
+from cachetools import TTLCache
+from fastapi import FastAPI, HTTPException, Query, BackgroundTasks, Request, Response
+from fastapi.responses import ORJSONResponse, JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import List, Optional, Any
-from datetime import datetime
+from fastapi.middleware.gzip import GZipMiddleware
+from pydantic import BaseModel, ConfigDict
+from typing import Dict, List, Optional, Any
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, date as date_type, time as time_type
+from pathlib import Path
 
 # Timezone-aware date handling
 from .timezone import get_current_timestamp, get_current_date, NBA_TIMEZONE
 
 from .predictor import get_prediction_service, NBAPredictionService
-from .database import init_db, get_history, get_stats, get_daily_cache
-from apscheduler.schedulers.background import BackgroundScheduler
+from .database import (
+    init_db, get_daily_cache, close_pool,
+    init_async_pool, close_async_pool, get_history_async, get_stats_async,
+    get_history_version_async, get_games_with_defaults_async, iter_history_async,
+    update_prediction_result, save_daily_cache, get_portfolio_history_async
+)
+from .audit import audit_predictions, ABBR_TO_PRIMARY
+from .scores import fetch_scores_for_date
+from .ai_worker import run_single_analysis, run_bulk_analysis, run_daily_analysis as run_ai_daily_analysis
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from backend.worker import run_daily_analysis
+from backend import finance_engine
+from backend.sentinel_agent import sentinel
+
+# Optional: brotli compression (falls back to gzip for clients without br)
+try:
+    from brotli_asgi import BrotliMiddleware
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+# Tracebacks go through a queue: the handler only enqueues, and both the
+# formatting and the stderr write happen on the listener thread instead of
+# the event loop. One-line status messages stay as print().
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that enqueues the raw record (msg/args/exc_info untouched)."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+_log = logging.getLogger("apkvox.api")
+_log.addHandler(_DeferredQueueHandler(_log_queue))
+_log.propagate = False
+_log_listener = logging.handlers.QueueListener(_log_queue, logging.StreamHandler())
 
 # ============================================================
 # Lifespan events (startup/shutdown)
 # ============================================================
+# Seconds a cron run may start late (e.g. loop busy at 08:00) before it is skipped
+SCHEDULER_MISFIRE_GRACE = 600
+
+
+async def _scheduled_daily_analysis() -> None:
+    """Scheduler entry point: the worker is blocking, so run it off the loop."""
+    await asyncio.to_thread(run_daily_analysis)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
+    _log_listener.start()
+    if API_DOCS_ENABLED:
+        app.openapi()  # build the schema now, not on the first /docs hit
+    _start_analysis_workers()
     print("[API] Initializing database...")
     try:
         init_db()
+        await init_async_pool()
         print("[API] Database ready")
         
-        # Initialize Autonomous Server (Scheduler)
-        scheduler = BackgroundScheduler()
+        # Initialize Autonomous Server (Scheduler) on the app's event loop
+        scheduler = AsyncIOScheduler(
+            event_loop=asyncio.get_running_loop(),
+            job_defaults={"misfire_grace_time": SCHEDULER_MISFIRE_GRACE},
+        )
         # Schedule jobs (Bogota time matches User/Server roughly)
         # Morning Analysis
-        scheduler.add_job(run_daily_analysis, 'cron', hour=8, minute=0, id='daily_morning_analysis')
+        scheduler.add_job(_scheduled_daily_analysis, 'cron', hour=8, minute=0, id='daily_morning_analysis')
         # Evening Update (Pre-Game)
-        scheduler.add_job(run_daily_analysis, 'cron', hour=18, minute=0, id='daily_evening_update')
+        scheduler.add_job(_scheduled_daily_analysis, 'cron', hour=18, minute=0, id='daily_evening_update')
         
         scheduler.start()
         print("[API] 🧠 Autonomous Server Online (Scheduled for 08:00 and 18:00)")
@@ -52,19 +118,30 @@ async def lifespan(app: FastAPI):
     print("[API] Shutting down...")
     try:
         scheduler.shutdown()
-    except:
-        pass
+    except Exception as e:
+        # Scheduler never started (startup failed) or is already down
+        print(f"[API] Scheduler shutdown skipped: {e}")
+    await _stop_analysis_workers()
+    await close_async_pool()
+    _audit_executor.shutdown(wait=False, cancel_futures=True)
+    close_pool()
+    _log_listener.stop()  # flushes queued records
 
 # ============================================================
 # FastAPI Application Setup
 # ============================================================
+# API_DOCS=0 turns off /docs, /redoc and /openapi.json (the mobile app never uses them)
+API_DOCS_ENABLED = os.getenv("API_DOCS", "1") != "0"
+
 app = FastAPI(
     title="NotiaBet API",
     description="NBA Game Prediction API powered by XGBoost ML models",
     version="1.1.0",
-    docs_url="/docs",
-    redoc_url="/redoc",
+    docs_url="/docs" if API_DOCS_ENABLED else None,
+    redoc_url="/redoc" if API_DOCS_ENABLED else None,
+    openapi_url="/openapi.json" if API_DOCS_ENABLED else None,
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # ============================================================
@@ -78,24 +155,40 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# ============================================================
+# Response Compression (list endpoints; /health stays under the threshold)
+# ============================================================
+COMPRESSION_MIN_SIZE = 1024
+
+if BROTLI_AVAILABLE:
+    app.add_middleware(BrotliMiddleware, quality=4, minimum_size=COMPRESSION_MIN_SIZE)
+else:
+    app.add_middleware(GZipMiddleware, minimum_size=COMPRESSION_MIN_SIZE, compresslevel=5)
+
 # ============================================================
 # Pydantic Models
 # ============================================================
-class HealthResponse(BaseModel):
+class ResponseModel(BaseModel):
+    """Base for outbound DTOs: immutable, unknown keys ignored."""
+    model_config = ConfigDict(extra='ignore', frozen=True, validate_assignment=False,
+                              str_strip_whitespace=False, ser_json_bytes='utf8')
+
+
+class HealthResponse(ResponseModel):
     status: str
     model: str
     version: str
     timestamp: str
 
 
-class AIImpact(BaseModel):
+class AIImpact(ResponseModel):
     summary: str
     impact_score: float
     key_factors: List[str]
     confidence: float
 
 
-class PredictionResponse(BaseModel):
+class PredictionResponse(ResponseModel):
     home_team: str
     away_team: str
     predicted_winner: str
@@ -119,13 +212,13 @@ class PredictionResponse(BaseModel):
     is_correct: Optional[int] = None
 
 
-class PredictionsListResponse(BaseModel):
+class PredictionsListResponse(ResponseModel):
     count: int
     predictions: List[PredictionResponse]
     generated_at: str
 
 
-class HistoryRecord(BaseModel):
+class HistoryRecord(ResponseModel):
     id: int
     game_date: str
     home_team: str
@@ -149,13 +242,13 @@ class HistoryRecord(BaseModel):
     away_score: Optional[int] = None
 
 
-class HistoryResponse(BaseModel):
+class HistoryResponse(ResponseModel):
     count: int
     records: List[HistoryRecord]
     generated_at: str
 
 
-class StatsResponse(BaseModel):
+class StatsResponse(ResponseModel):
     total_predictions: int
     completed_games: int
     correct_predictions: int
@@ -163,25 +256,294 @@ class StatsResponse(BaseModel):
     pending_games: int
 
 
+# ============================================================
+# Response Cache (pre-serialized JSON bytes)
+# ============================================================
+RESPONSE_CACHE_TTL = 30              # today/upcoming predictions (live scores)
+PAST_RESPONSE_CACHE_TTL = 3600       # past dates: results are settled
+STATS_RESPONSE_CACHE_TTL = 30
+PREDICTIONS_CACHE_CONTROL = "private, max-age=30"
+
+_resp_cache = TTLCache(maxsize=256, ttl=RESPONSE_CACHE_TTL)           # key -> (etag, body)
+_past_resp_cache = TTLCache(maxsize=256, ttl=PAST_RESPONSE_CACHE_TTL)
+_stats_resp_cache = TTLCache(maxsize=1, ttl=STATS_RESPONSE_CACHE_TTL)
+
+# Auto-triggered AI analysis: a team is skipped while its job is queued or
+# running, and for ANALYSIS_DEDUP_TTL after it finishes (the window starts at
+# completion, so it always outlasts the job however long that takes)
+_STALE_AI_RE = re.compile(r"pendiente|sin\s*datos", re.IGNORECASE)
+ANALYSIS_DEDUP_TTL = 300
+_recent_analysis = TTLCache(maxsize=512, ttl=ANALYSIS_DEDUP_TTL)  # team -> finished at (monotonic)
+_analysis_in_flight: set = set()                                  # teams queued or running
+
+_ORJSON_OPTS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _json_bytes_response(body: bytes) -> Response:
+    return Response(content=body, media_type="application/json")
+
+
+# Fully settled past dates never change: their bodies are written once and
+# served from disk across restarts and in-memory cache evictions
+PAST_PREDICTIONS_DIR = Path(__file__).resolve().parent.parent / "cache" / "preds"
+
+
+def _read_past_body(game_date: str) -> Optional[bytes]:
+    try:
+        return (PAST_PREDICTIONS_DIR / f"{game_date}.json").read_bytes()
+    except OSError:
+        return None
+
+
+def _write_past_body(game_date: str, body: bytes) -> None:
+    path = PAST_PREDICTIONS_DIR / f"{game_date}.json"
+    try:
+        PAST_PREDICTIONS_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(body)
+        tmp.replace(path)  # atomic: readers never see a partial file
+    except OSError as e:
+        print(f"[API] Could not persist predictions for {game_date}: {e}")
+
+
+def _drop_past_body(game_date: str) -> None:
+    try:
+        (PAST_PREDICTIONS_DIR / f"{game_date}.json").unlink(missing_ok=True)
+    except OSError as e:
+        print(f"[API] Could not drop persisted predictions for {game_date}: {e}")
+
+
+def _all_settled(predictions: List[dict]) -> bool:
+    return all(
+        p.get("status") == "FINAL" and p.get("home_score") is not None and p.get("away_score") is not None
+        for p in predictions
+    )
+
+
+def _body_etag(body: bytes) -> str:
+    return '"%s"' % hashlib.blake2b(body, digest_size=8).hexdigest()
+
+
+# Stamped fresh on every rebuild; left out of the predictions ETag so a rebuilt
+# body with the same games still matches the client's If-None-Match
+_VOLATILE_PRED_FIELDS = ("timestamp",)
+
+
+def _predictions_etag(predictions: List[dict]) -> str:
+    """ETag over the games only (no generated_at / per-row timestamp)."""
+    return _body_etag(orjson.dumps(
+        [{k: v for k, v in p.items() if k not in _VOLATILE_PRED_FIELDS} for p in predictions],
+        option=_ORJSON_OPTS
+    ))
+
+
+def _conditional_response(request: Request, etag: str, body: bytes, cache_control: str) -> Response:
+    """304 when the client already holds this body, else the body with its ETag."""
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
 # ============================================================
 # API Endpoints
 # ============================================================
-@app.get("/health", response_model=HealthResponse, tags=["System"])
+_HEALTH_TEMPLATE = b'{"status":"ok","model":"XGBoost","version":"1.1.0","timestamp":"%s"}'
+
+_ROOT_BYTES = orjson.dumps({
+    "name": "NotiaBet API",
+    "version": "1.1.0",
+    "model": "XGBoost",
+    "endpoints": {
+        "health": "/health",
+        "predictions": "/api/predictions",
+        "history": "/api/history",
+        "stats": "/api/stats",
+        "docs": "/docs"
+    }
+})
+
+
+@app.get("/health", responses={200: {"model": HealthResponse}}, tags=["System"])
 async def health_check():
     """
     Health check endpoint.
     Returns server status and model type.
     """
-    return HealthResponse(
-        status="ok",
-        model="XGBoost",
-        version="1.1.0",
-        timestamp=get_current_timestamp()
-    )
+    return _json_bytes_response(_HEALTH_TEMPLATE % get_current_timestamp().encode())
+
+
+# Stored game -> API prediction: filled in SQL under each game's non-null
+# fields (nullable result fields stay present as null)
+_HIST_DEFAULTS = {
+    "timestamp": "",
+    "winner_confidence": 0,
+    "home_win_probability": 0,
+    "away_win_probability": 0,
+    "ou_confidence": 0,
+    "under_over_line": 0,
+    "under_over_prediction": "N/A",
+    "predicted_winner": "N/A",
+    "home_odds": 0,
+    "away_odds": 0,
+    "status": "FINAL",
+    "recommendation": "NO DATA",
+    "home_score": None,
+    "away_score": None,
+    "actual_winner": None,
+    "is_correct": None,
+    "ai_impact": {
+        "summary": "Sin análisis histórico",
+        "impact_score": 0,
+        "key_factors": [],
+        "confidence": 0
+    },
+}
+
 
+# Schedule-only past games (no stored prediction): constant fields
+_FALLBACK_TEMPLATE = {
+    "predicted_winner": "N/A",  # No prediction available
+    "home_win_probability": 50.0,
+    "away_win_probability": 50.0,
+    "winner_confidence": 0.0,
+    "under_over_prediction": "N/A",
+    "under_over_line": 0.0,
+    "ou_confidence": 0.0,
+    "home_odds": 0,
+    "away_odds": 0,
+    "recommendation": "NO DATA",
+    "edge_percent": 0.0,
+    "ai_impact": {
+        "summary": "Sin predicción histórica disponible",
+        "impact_score": 0.0,
+        "key_factors": [],
+        "confidence": 0
+    },
+    "status": "FINAL",
+    "is_correct": None  # Can't calculate without prediction
+}
 
-@app.get("/api/predictions", response_model=PredictionsListResponse, tags=["Predictions"])
+
+# Audits get their own small pool: a slow score fetch never occupies the
+# default executor threads that serve inference for live requests
+AUDIT_WORKERS = 2
+_audit_executor = ThreadPoolExecutor(max_workers=AUDIT_WORKERS, thread_name_prefix="audit")
+_audits_in_flight = set()
+_inflight: Dict[tuple, asyncio.Future] = {}
+
+
+async def _singleflight(key: tuple, func, *args, **kwargs):
+    """Run func in a worker thread once per key; concurrent callers await the same result."""
+    fut = _inflight.get(key)
+    if fut is None:
+        fut = asyncio.ensure_future(asyncio.to_thread(func, *args, **kwargs))
+        _inflight[key] = fut
+        fut.add_done_callback(lambda _: _inflight.pop(key, None))
+    # shield: a disconnecting client must not cancel work other requests are awaiting
+    return await asyncio.shield(fut)
+
+
+def _drop_cached_predictions(date: str) -> None:
+    """Evict cached bodies that can contain a date's games (incl. the default window),
+    the date's persisted body, and stats."""
+    for cache in (_resp_cache, _past_resp_cache):
+        for key in [k for k in list(cache.keys()) if k[2] in (date, None)]:
+            cache.pop(key, None)
+    _stats_resp_cache.clear()
+    try:
+        _drop_past_body(date_type.fromisoformat(date).isoformat())
+    except ValueError:
+        pass  # not a YYYY-MM-DD date, so nothing was persisted under it
+
+
+def _drop_upcoming_predictions() -> None:
+    """Evict today/upcoming bodies so fresh AI insights show up on the next request."""
+    _resp_cache.clear()
+
+
+async def _analyze_in_background(func, *args) -> None:
+    """Run a blocking AI analysis off the loop, then drop the bodies it made stale."""
+    await asyncio.to_thread(func, *args)
+    _drop_upcoming_predictions()
+
+
+# AI analysis jobs go through a bounded queue drained by a fixed set of
+# workers: at most ANALYSIS_WORKERS LLM runs at once, and a full queue
+# rejects new jobs instead of piling up threads.
+ANALYSIS_QUEUE_SIZE = 32
+ANALYSIS_WORKERS = 2
+_analysis_queue: Optional[asyncio.Queue] = None
+_analysis_tasks: List[asyncio.Task] = []
+
+
+async def _analysis_worker() -> None:
+    while True:
+        func, args, teams = await _analysis_queue.get()
+        try:
+            await _analyze_in_background(func, *args)
+        except Exception as e:
+            print(f"[API] AI analysis job failed: {e}")
+        finally:
+            now = time.monotonic()
+            for team in teams:
+                _analysis_in_flight.discard(team)
+                _recent_analysis[team] = now
+            _analysis_queue.task_done()
+
+
+def _start_analysis_workers() -> None:
+    global _analysis_queue
+    _analysis_queue = asyncio.Queue(maxsize=ANALYSIS_QUEUE_SIZE)
+    _analysis_tasks[:] = [asyncio.create_task(_analysis_worker()) for _ in range(ANALYSIS_WORKERS)]
+
+
+async def _stop_analysis_workers() -> None:
+    # Runs already in a thread finish on their own; queued jobs are dropped
+    for task in _analysis_tasks:
+        task.cancel()
+    await asyncio.gather(*_analysis_tasks, return_exceptions=True)
+    _analysis_tasks.clear()
+
+
+def _analysis_pending(team: str) -> bool:
+    """True while the team's analysis is queued/running or finished recently."""
+    return team in _analysis_in_flight or team in _recent_analysis
+
+
+def _enqueue_analysis(func, *args, teams: tuple = ()) -> bool:
+    """Queue an AI analysis job; False when the queue is full (or not running)."""
+    if _analysis_queue is None:
+        return False
+    try:
+        _analysis_queue.put_nowait((func, args, teams))
+        _analysis_in_flight.update(teams)
+        return True
+    except asyncio.QueueFull:
+        print(f"[API] AI analysis queue full ({ANALYSIS_QUEUE_SIZE}), dropping {func.__name__}{args}")
+        return False
+
+
+async def _audit_in_background(target_dt: datetime, date: str) -> None:
+    """Audit a past date off the request path; concurrent requests share one run."""
+    if date in _audits_in_flight:
+        return
+    _audits_in_flight.add(date)
+    try:
+        loop = asyncio.get_running_loop()
+        audit_stats = await loop.run_in_executor(_audit_executor, audit_predictions, target_dt)
+        print(f"[API] Audit Triggered for {date}: {audit_stats}")
+        if audit_stats.get("audited"):
+            _drop_cached_predictions(date)
+    except Exception as audit_err:
+        print(f"[API] Audit warning: {audit_err}")
+    finally:
+        _audits_in_flight.discard(date)
+
+
+@app.get("/api/predictions", responses={200: {"model": PredictionsListResponse}}, tags=["Predictions"])
 async def get_predictions(
+    request: Request,
     background_tasks: BackgroundTasks,
     sportsbook: str = Query("fanduel", description="Sportsbook to fetch odds from"),
     date: Optional[str] = Query(None, description="Date in YYYY-MM-DD format to fetch past/future games"),
@@ -193,127 +555,99 @@ async def get_predictions(
     
     AUTO-TRIGGER: If AI insights are missing ("Análisis pendiente" or "Sin datos"),
     this endpoint queues a background analysis task for those teams.
+
+    Supports conditional GET (ETag / If-None-Match -> 304).
     """
+    cache_key = ("preds", sportsbook, date, None if date else days)
+    cached = _past_resp_cache.get(cache_key) or _resp_cache.get(cache_key)
+    if cached is not None:
+        return _conditional_response(request, *cached, PREDICTIONS_CACHE_CONTROL)
+
+    now_ts = get_current_timestamp()  # one timestamp for the whole request
     try:
-        service = get_prediction_service(sportsbook=sportsbook)
+        # First call loads the models; keep that off the event loop
+        service = await asyncio.to_thread(get_prediction_service, sportsbook=sportsbook)
         
         target_predictions = []
+        is_past = False
+        from_db = False  # only DB-backed past bodies are persisted to disk
         
         if date:
             try:
-                # Parse date string
-                target_dt = datetime.strptime(date, "%Y-%m-%d")
-                target_date = target_dt.date()
+                # Parse date string (C fromisoformat instead of strptime)
+                target_date = date_type.fromisoformat(date)
+                target_dt = datetime.combine(target_date, time_type.min)
                 today = get_current_date() # From timezone module
                 
                 # Check if date is in the past
                 if target_date < today:
-                    from .database import get_history
-                    from .audit import audit_predictions
-                    from .scores import fetch_scores_for_date
+                    is_past = True
+
+                    # 0. Settled dates are served straight from disk (path built from the parsed date)
+                    body = await asyncio.to_thread(_read_past_body, target_date.isoformat())
+                    if body is not None:
+                        etag = _predictions_etag(orjson.loads(body)["predictions"])
+                        _past_resp_cache[cache_key] = (etag, body)
+                        return _conditional_response(request, *_past_resp_cache[cache_key], PREDICTIONS_CACHE_CONTROL)
                     
                     # 1. Check if we have predictions in DB
-                    existing = get_history(limit=100, game_date=date)
+                    # (already in API format: defaults are merged by the query)
+                    existing = await get_games_with_defaults_async(
+                        date, {**_HIST_DEFAULTS, "start_time_utc": f"{date}T00:00:00Z"}
+                    )
                     
                     if existing:
                         # We have stored predictions - use them
-                        history_records = existing
-                        
-                        # Trigger Audit to update scores
-                        try:
-                            audit_stats = audit_predictions(target_dt)
-                            print(f"[API] Audit Triggered for {date}: {audit_stats}")
-                            # Re-fetch after audit to get updated scores
-                            history_records = get_history(limit=100, game_date=date)
-                        except Exception as audit_err:
-                            print(f"[API] Audit warning: {audit_err}")
+                        target_predictions = existing
+                        from_db = True
                         
-                        # Convert to API format
-                        for rec in history_records:
-                            rec["timestamp"] = rec.get("created_at", "") or ""
-                            rec["start_time_utc"] = (rec.get("game_date") or "") + "T00:00:00Z"
-                            rec["winner_confidence"] = rec.get("confidence", 0) or 0
-                            rec["home_win_probability"] = rec.get("home_win_probability", 0) or 0
-                            rec["away_win_probability"] = rec.get("away_win_probability", 0) or 0
-                            rec["ou_confidence"] = rec.get("ou_confidence", 0) or 0
-                            rec["under_over_line"] = rec.get("under_over_line", 0) or 0
-                            rec["under_over_prediction"] = rec.get("under_over_prediction", "N/A") or "N/A"
-                            rec["predicted_winner"] = rec.get("predicted_winner") or "N/A"
-                            rec["home_odds"] = rec.get("home_odds") or 0
-                            rec["away_odds"] = rec.get("away_odds") or 0
-                            rec["status"] = rec.get("status", "FINAL")
-                            rec["recommendation"] = rec.get("recommendation", "NO DATA")
-                            # Ensure ai_impact is a dict if missing
-                            if "ai_impact" not in rec or not rec["ai_impact"]:
-                                rec["ai_impact"] = {
-                                    "summary": "Sin análisis histórico",
-                                    "impact_score": 0,
-                                    "key_factors": [],
-                                    "confidence": 0
-                                }
-                            target_predictions.append(rec)
+                        # Audit (score refresh) runs after the response is sent;
+                        # the next poll picks up the updated scores. Settled days have
+                        # nothing left to refresh.
+                        if not _all_settled(existing):
+                            background_tasks.add_task(_audit_in_background, target_dt, date)
                     else:
                         # No stored predictions - FALLBACK: Show schedule games with scores from CSV
                         print(f"[API] No predictions in DB for {date}. Showing schedule fallback...")
                         
                         # Get scores/games from CSV schedule
-                        scores_data = fetch_scores_for_date(target_dt)
+                        scores_data = await _singleflight(("scores", date), fetch_scores_for_date, target_dt)
                         
                         if scores_data:
+                            start_time_utc = f"{date}T00:00:00Z"
+                            timestamp = now_ts
                             for key, game_data in scores_data.items():
                                 # Key format is "HOME_ABBR:AWAY_ABBR"
                                 # We need to convert abbreviations back to full names
-                                from .audit import TEAM_MAP
-                                
-                                # Reverse lookup for team names
-                                abbr_to_name = {v: k for k, v in TEAM_MAP.items() if len(k) > 5}
-                                
                                 home_abbr = game_data.get("home_abbr", "")
                                 away_abbr = game_data.get("away_abbr", "")
                                 
-                                home_name = abbr_to_name.get(home_abbr, home_abbr)
-                                away_name = abbr_to_name.get(away_abbr, away_abbr)
+                                home_name = ABBR_TO_PRIMARY.get(home_abbr, home_abbr)
+                                away_name = ABBR_TO_PRIMARY.get(away_abbr, away_abbr)
                                 
                                 home_score = game_data.get("home_score", 0)
                                 away_score = game_data.get("away_score", 0)
                                 actual_winner = home_name if home_score > away_score else away_name
                                 
-                                fallback_pred = {
+                                target_predictions.append({
+                                    **_FALLBACK_TEMPLATE,
                                     "home_team": home_name,
                                     "away_team": away_name,
-                                    "predicted_winner": "N/A",  # No prediction available
-                                    "home_win_probability": 50.0,
-                                    "away_win_probability": 50.0,
-                                    "winner_confidence": 0.0,
-                                    "under_over_prediction": "N/A",
-                                    "under_over_line": 0.0,
-                                    "ou_confidence": 0.0,
-                                    "home_odds": 0,
-                                    "away_odds": 0,
-                                    "start_time_utc": f"{date}T00:00:00Z",
-                                    "timestamp": get_current_timestamp(),
-                                    "recommendation": "NO DATA",
-                                    "edge_percent": 0.0,
-                                    "ai_impact": {
-                                        "summary": "Sin predicción histórica disponible",
-                                        "impact_score": 0.0,
-                                        "key_factors": [],
-                                        "confidence": 0
-                                    },
-                                    "status": "FINAL",
+                                    "start_time_utc": start_time_utc,
+                                    "timestamp": timestamp,
                                     "home_score": home_score,
                                     "away_score": away_score,
                                     "actual_winner": actual_winner,
-                                    "is_correct": None  # Can't calculate without prediction
-                                }
-                                target_predictions.append(fallback_pred)
+                                })
                         
                         print(f"[API] Fallback returned {len(target_predictions)} games from schedule")
                         
                 else:
                     # Future/Today: Use Predictor Service
                     # Now supports target_date!
-                    target_predictions = service.get_upcoming_predictions(target_date=target_dt)
+                    target_predictions = await _singleflight(
+                        ("upcoming", sportsbook, date), service.get_upcoming_predictions, target_date=target_dt
+                    )
                     
             except ValueError:
                  return JSONResponse(
@@ -322,54 +656,82 @@ async def get_predictions(
                 )
         else:
             # Default: Use the 'days' parameter (default: 1 for speed)
-            target_predictions = service.get_upcoming_predictions(days=days)
+            target_predictions = await _singleflight(
+                ("upcoming", sportsbook, days), service.get_upcoming_predictions, days=days
+            )
 
         # --- AUTO-TRIGGER AI ANALYSIS ---
-        from .ai_worker import run_single_analysis
-        
         teams_to_analyze = set()
         
         for p in target_predictions:
             # Check if AI data is missing or pending
-            ai = p.get("ai_impact", {})
-            summary = ai.get("summary", "") if ai else ""
+            ai = p.get("ai_impact")
+            summary = ai.get("summary") if ai else None
             
             # Criteria for re-analysis:
             # 1. Summary contains "Análisis pendiente" (Pending)
             # 2. Summary contains "Sin datos" (No Data)
             # 3. Summary is empty
-            if not summary or "pendiente" in summary.lower() or "sin datos" in summary.lower():
-                home = p.get("home_team")
-                away = p.get("away_team")
-                if home: teams_to_analyze.add(home)
-                if away: teams_to_analyze.add(away)
+            if not summary or _STALE_AI_RE.search(summary):
+                # Skip teams already queued/analyzed (every poll sees the same stale rows)
+                for team in (p.get("home_team"), p.get("away_team")):
+                    if team and not _analysis_pending(team):
+                        teams_to_analyze.add(team)
         
         if teams_to_analyze:
-            print(f"[API] Triggering background AI analysis for {len(teams_to_analyze)} teams: {list(teams_to_analyze)}")
-            for team in teams_to_analyze:
-                background_tasks.add_task(run_single_analysis, team)
-
-        return PredictionsListResponse(
-            count=len(target_predictions),
-            predictions=[PredictionResponse(**p) for p in target_predictions],
-            generated_at=get_current_timestamp()
-        )
+            print(f"[API] Triggering background AI analysis for {len(teams_to_analyze)} teams: {teams_to_analyze}")
+            # One job for all teams: one investigator, one cache query, concurrent fan-out
+            teams = tuple(teams_to_analyze)
+            _enqueue_analysis(run_bulk_analysis, list(teams), teams=teams)
+
+        # Rows are already plain dicts from the predictor/DB; they go straight to
+        # orjson (PredictionsListResponse only documents the schema)
+        body = orjson.dumps({
+            "count": len(target_predictions),
+            "predictions": target_predictions,
+            "generated_at": now_ts
+        }, option=_ORJSON_OPTS)
+        etag = _predictions_etag(target_predictions)
+        if target_predictions:
+            # Only fully settled past days get the 1h cache; a past date with games
+            # still live keeps the 30s TTL so the next miss re-audits its scores
+            settled = is_past and _all_settled(target_predictions)
+            (_past_resp_cache if settled else _resp_cache)[cache_key] = (etag, body)
+            # Schedule-fallback rows always look settled; persisting them would
+            # hide predictions saved for that date later
+            if settled and from_db:
+                await asyncio.to_thread(_write_past_body, target_date.isoformat(), body)
+        return _conditional_response(request, etag, body, PREDICTIONS_CACHE_CONTROL)
     except Exception as e:
         # Return empty list on error instead of failing
-        import traceback
-        print(f"[API] Error getting predictions: {e}")
-        traceback.print_exc()
-        return PredictionsListResponse(
-            count=0,
-            predictions=[],
-            generated_at=get_current_timestamp()
-        )
+        _log.exception("[API] Error getting predictions: %s", e)
+        return ORJSONResponse({
+            "count": 0,
+            "predictions": [],
+            "generated_at": now_ts
+        })
+
+
+HISTORY_CACHE_CONTROL = "public, max-age=60"
+HISTORY_STREAM_MIN = 500  # larger (or unlimited, limit<=0) requests are streamed
 
 
-@app.get("/api/history", response_model=HistoryResponse, tags=["History"])
+async def _stream_history(limit: int, game_date: Optional[str], include_ai: bool):
+    """Yield the history body record by record; count goes last since it is only known at the end."""
+    yield b'{"generated_at":' + orjson.dumps(get_current_timestamp()) + b',"records":['
+    count = 0
+    async for game in iter_history_async(limit, game_date, include_ai):
+        yield (b"," if count else b"") + orjson.dumps(game, option=_ORJSON_OPTS)
+        count += 1
+    yield b'],"count":%d}' % count
+
+
+@app.get("/api/history", responses={200: {"model": HistoryResponse}}, tags=["History"])
 async def get_prediction_history(
+    request: Request,
     limit: int = 100,
-    game_date: Optional[str] = None
+    game_date: Optional[str] = None,
+    include: Optional[str] = Query(None, description="Comma-separated optional fields: ai_impact")
 ):
     """
     Get prediction history from database.
@@ -377,24 +739,43 @@ async def get_prediction_history(
     Args:
         limit: Maximum number of records to return (default 100)
         game_date: Optional filter by specific date (YYYY-MM-DD format)
+        include: 'ai_impact' to include each game's AI analysis (omitted by default)
 
     Returns:
         List of historical predictions with results if available.
+        Supports conditional GET (ETag / If-None-Match -> 304).
     """
+    include_ai = "ai_impact" in (include or "").split(",")
     try:
-        records = get_history(limit=limit, game_date=game_date)
-        return HistoryResponse(
-            count=len(records),
-            records=[HistoryRecord(**r) for r in records],
-            generated_at=get_current_timestamp()
-        )
+        # ETag from the latest write to the queried range; skips the history query on a match
+        version = await get_history_version_async(game_date)
+        headers = {"Cache-Control": HISTORY_CACHE_CONTROL}
+        if version:
+            digest = hashlib.md5(f"{version}|{limit}|{game_date}|{include_ai}".encode()).hexdigest()
+            headers["ETag"] = f'W/"{digest}"'
+            if request.headers.get("if-none-match") == headers["ETag"]:
+                return Response(status_code=304, headers=headers)
+
+        if limit <= 0 or limit > HISTORY_STREAM_MIN:
+            return StreamingResponse(
+                _stream_history(limit, game_date, include_ai),
+                media_type="application/json", headers=headers
+            )
+
+        records = await get_history_async(limit=limit, game_date=game_date, include_ai=include_ai)
+        # DB rows flow straight to orjson; no per-row HistoryRecord construction
+        return ORJSONResponse({
+            "count": len(records),
+            "records": records,
+            "generated_at": get_current_timestamp()
+        }, headers=headers)
     except Exception as e:
         print(f"[API] Error getting history: {e}")
-        return HistoryResponse(
-            count=0,
-            records=[],
-            generated_at=get_current_timestamp()
-        )
+        return ORJSONResponse({
+            "count": 0,
+            "records": [],
+            "generated_at": get_current_timestamp()
+        })
 
 
 @app.get("/api/stats", response_model=StatsResponse, tags=["History"])
@@ -405,9 +786,15 @@ async def get_prediction_stats():
     Returns:
         Stats including total predictions, completed games, correct predictions, and win rate.
     """
+    cached = _stats_resp_cache.get("stats")
+    if cached is not None:
+        return _json_bytes_response(cached)
+
     try:
-        stats = get_stats()
-        return StatsResponse(**stats)
+        stats = await get_stats_async()
+        body = orjson.dumps(StatsResponse.model_validate(stats).model_dump())
+        _stats_resp_cache["stats"] = body
+        return _json_bytes_response(body)
     except Exception as e:
         print(f"[API] Error getting stats: {e}")
         return StatsResponse(
@@ -422,18 +809,7 @@ async def get_prediction_stats():
 @app.get("/", tags=["System"])
 async def root():
     """Root endpoint with API info"""
-    return {
-        "name": "NotiaBet API",
-        "version": "1.1.0",
-        "model": "XGBoost",
-        "endpoints": {
-            "health": "/health",
-            "predictions": "/api/predictions",
-            "history": "/api/history",
-            "stats": "/api/stats",
-            "docs": "/docs"
-        }
-    }
+    return _json_bytes_response(_ROOT_BYTES)
 
 
 # ============================================================
@@ -452,9 +828,8 @@ async def set_debug_result(request: DebugResultRequest):
     """
     Manually set the result of a game to test UI states (Live/Final).
     """
-    from .database import update_prediction_result
-    
-    success = update_prediction_result(
+    success = await asyncio.to_thread(
+        update_prediction_result,
         request.game_date,
         request.home_team,
         request.away_team,
@@ -464,6 +839,7 @@ async def set_debug_result(request: DebugResultRequest):
     )
     
     if success:
+        _drop_cached_predictions(request.game_date)
         return {"status": "success", "message": "Game result updated"}
     else:
         raise HTTPException(status_code=404, detail="Prediction not found")
@@ -473,30 +849,23 @@ async def set_debug_result(request: DebugResultRequest):
 # AI Analysis Endpoints (On-Demand)
 # ============================================================
 
-class AnalyzeResponse(BaseModel):
+class AnalyzeResponse(ResponseModel):
     status: str
     team: str
     message: str
 
 
 @app.post("/api/analyze/{team_name}", response_model=AnalyzeResponse, tags=["AI Analysis"])
-async def analyze_team(team_name: str, background_tasks: BackgroundTasks):
+async def analyze_team(team_name: str):
     """
     Trigger AI analysis for a specific team.
     Analysis runs in background - results cached in database.
     Call /api/predictions after a few seconds to see updated ai_impact.
     """
-    from .ai_worker import run_single_analysis
-    from .predictor import reset_service
-    
-    def analyze_and_reset(team: str):
-        """Run analysis and then reset service cache"""
-        run_single_analysis(team)
-        reset_service()  # Force predictions to regenerate with new AI insights
-        print(f"[API] Analysis complete and cache reset for {team}")
-    
-    # Run analysis in background (non-blocking)
-    background_tasks.add_task(analyze_and_reset, team_name)
+    # Run analysis in background (non-blocking); cached responses are dropped after.
+    # Polls seeing this team's stale insight won't queue it again meanwhile.
+    if not _enqueue_analysis(run_single_analysis, team_name, teams=(team_name,)):
+        raise HTTPException(status_code=503, detail="AI analysis queue is full, try again later")
     
     return AnalyzeResponse(
         status="analyzing",
@@ -506,21 +875,14 @@ async def analyze_team(team_name: str, background_tasks: BackgroundTasks):
 
 
 @app.post("/api/analyze/all", tags=["AI Analysis"])
-async def analyze_all_teams(background_tasks: BackgroundTasks):
+async def analyze_all_teams():
     """
     Trigger AI analysis for all teams playing today.
     This is the same as running: python -m backend.ai_worker
     """
-    from .ai_worker import run_daily_analysis
-    from .predictor import reset_service
-    
-    def analyze_all_and_reset():
-        """Run daily analysis and then reset service cache"""
-        run_daily_analysis()
-        reset_service()  # Force predictions to regenerate with new AI insights
-        print("[API] Daily analysis complete and cache reset")
-    
-    background_tasks.add_task(analyze_all_and_reset)
+    # use_batch=False: a Groq Batch poll would hold an analysis worker for up to 10 min
+    if not _enqueue_analysis(run_ai_daily_analysis, False):
+        raise HTTPException(status_code=503, detail="AI analysis queue is full, try again later")
     
     return {
         "status": "analyzing",
@@ -531,20 +893,17 @@ async def analyze_all_teams(background_tasks: BackgroundTasks):
 # FINTECH ENDPOINTS (The Automated Investment Manager)
 # =====================================================================
 
-from backend import finance_engine
-from backend.sentinel_agent import sentinel
-
 @app.get("/api/portfolio", tags=["Fintech"])
-def get_portfolio():
+async def get_portfolio():
     """Returns portfolio history and current stats."""
-    history = database.get_portfolio_history(limit=30)
+    history = await get_portfolio_history_async(limit=30)
     return {"history": history}
 
 class StrategyRequest(BaseModel):
     bankroll: float = 50000.0
 
 @app.post("/api/strategy/optimize", tags=["Fintech"])
-def optimize_strategy(request: StrategyRequest):
+async def optimize_strategy(request: StrategyRequest):
     """
     Takes current bankroll.
     Runs 'The Sniper Engine' on TODAY's predictions.
@@ -564,7 +923,7 @@ def optimize_strategy(request: StrategyRequest):
         today_str = get_current_date().strftime("%Y-%m-%d")
 
         # --- CACHE LAYER (Autonomous Server) ---
-        cached_data = get_daily_cache(today_str)
+        cached_data = await asyncio.to_thread(get_daily_cache, today_str)
         if cached_data and cached_data.get('strategy_json'):
             print(f"⚡ [Main] Serving cached strategy for {today_str}")
             strategy = cached_data['strategy_json']
@@ -577,12 +936,13 @@ def optimize_strategy(request: StrategyRequest):
             basis = float(strategy.get('bankroll_basis', 10000))
             ratio = user_bankroll / basis
             
-            # Deep copy to avoid mutating cache (if in-memory, though here it's new dict from DB)
-            response_bets = []
-            for bet in strategy.get('proposed_bets', []):
-                new_bet = bet.copy()
-                new_bet['stake_amount'] = round(bet['stake_amount'] * ratio, 2)
-                response_bets.append(new_bet)
+            # Scale all stakes in one NumPy op; new dicts so the cached bets stay untouched
+            cached_bets = strategy.get('proposed_bets', [])
+            stakes = np.fromiter((bet['stake_amount'] for bet in cached_bets), dtype=np.float64, count=len(cached_bets))
+            response_bets = [
+                {**bet, 'stake_amount': stake}
+                for bet, stake in zip(cached_bets, np.round(stakes * ratio, 2).tolist())
+            ]
                 
             return {
                 "strategy": strategy.get('strategy'),
@@ -594,17 +954,15 @@ def optimize_strategy(request: StrategyRequest):
         print(f"💨 [Main] Cache miss for {today_str}. Running on-demand (and saving)...")
         # ----------------------------------------
 
-        # Ensure we are using the imported function, not database module directly
-        raw_preds = get_history(limit=1, game_date=today_str) 
+        # All of today's games in one query (limit is per game; 0 = the whole day)
+        raw_preds = await get_history_async(limit=0, game_date=today_str)
         
         if not raw_preds:
             try:
-                # Use the service getter
-                raw_preds = get_prediction_service().get_predictions_for_date(today_str)
-                # Save these new predictions to history so next time get_history finds them
-                if raw_preds:
-                     from .database import save_predictions
-                     save_predictions(raw_preds)
+                # Use the service getter (get_upcoming_predictions also saves them
+                # to history, so next time get_history finds them)
+                service = await asyncio.to_thread(get_prediction_service)
+                raw_preds = await asyncio.to_thread(service.get_upcoming_predictions, days=1)
             except Exception as inner_e:
                 print(f"[Sniper] Error fetching fresh predictions: {inner_e}")
                 raw_preds = []
@@ -612,14 +970,14 @@ def optimize_strategy(request: StrategyRequest):
         # 2. Optimize Portfolio (Kelly + Sniper)
         # Ensure bankroll is float
         bankroll = float(request.bankroll)
-        proposed_bets = finance_engine.optimize_portfolio(raw_preds, bankroll)
+        proposed_bets = await asyncio.to_thread(finance_engine.optimize_portfolio, raw_preds, bankroll)
         
         # 3. Sentinel Risk Analysis
         # Convert bet models to dicts for AI
         bets_dicts = [bet.model_dump() for bet in proposed_bets]
         
         try:
-            risk_advice = sentinel.analyze_risk(bets_dicts, bankroll)
+            risk_advice = await asyncio.to_thread(sentinel.analyze_risk, bets_dicts, bankroll)
         except Exception as e:
             print(f"[Sniper] Sentinel error: {e}")
             risk_advice = "Sentinel AI is taking a nap. (Error de conexión)"
@@ -637,16 +995,15 @@ def optimize_strategy(request: StrategyRequest):
         
         # SELF-HEALING: Save this result to cache so the next user gets it fast
         # (Even though this validly serves the current request, might as well cache it)
-        from .worker import run_daily_analysis
         # We can't easily inject just the result into the worker's logic without duplicating save logic.
         # But we can call save_daily_cache directly.
-        from .database import save_daily_cache
         
         # We need to normalize the payload for cache (basis = user bankroll)
         cache_payload = response.copy()
         cache_payload['bankroll_basis'] = bankroll
         
-        save_daily_cache(
+        await asyncio.to_thread(
+            save_daily_cache,
             entry_date=today_str,
             predictions=raw_preds, # We have these
             strategy=cache_payload,
@@ -657,13 +1014,12 @@ def optimize_strategy(request: StrategyRequest):
         return response
 
     except Exception as e:
-        import traceback
         error_msg = f"Sniper Crash: {str(e)}\n{traceback.format_exc()}"
-        print(error_msg)
+        _log.error(error_msg)
         raise HTTPException(status_code=500, detail=error_msg)
 
 @app.post("/api/admin/refresh-daily", tags=["Admin"])
-def force_refresh(background_tasks: BackgroundTasks):
+async def force_refresh(background_tasks: BackgroundTasks):
     """
     Manually trigger the Autonomous Worker to refresh today's data.
     Returns immediately, work happens in background.
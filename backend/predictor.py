@@ -7,6 +7,8 @@ providing a clean API for FastAPI integration.
 
 import sys
 import io
+import threading
+from functools import lru_cache
 import contextlib
 from pathlib import Path
 from concurrent.futures import ThreadPoolExecutor, as_completed
@@ -44,7 +46,7 @@ from src.Utils.Dictionaries import team_index_current
 from src.DataProviders.SbrOddsProvider import SbrOddsProvider
 
 # Database persistence
-from .database import save_predictions
+from .database import save_predictions, get_ai_insight, get_insights_for_dates
 
 # URLs from original main.py
 from src.Utils.FeatureEngine import FeatureEngine
@@ -55,6 +57,10 @@ DATA_URL_ADV = "https://stats.nba.com/stats/leaguedashteamstats?Conference=&Date
 DATA_URL_ADV_TEN = "https://stats.nba.com/stats/leaguedashteamstats?Conference=&DateFrom=&DateTo=&Division=&GameScope=&GameSegment=&LastNGames=10&LeagueID=00&Location=&MeasureType=Advanced&Month=0&OpponentTeamID=0&Outcome=&PORound=0&PaceAdjust=N&PerMode=PerGame&Period=0&PlayerExperience=&PlayerPosition=&PlusMinus=N&Rank=N&Season=2025-26&SeasonSegment=&SeasonType=Regular%20Season&ShotClockRange=&StarterBench=&TeamID=0&TwoWay=0&VsConference=&VsDivision="
 SCHEDULE_PATH = NBA_ENGINE_PATH / "Data" / "nba-2025-UTC.csv"
 
+# One shared (interned) str object per team: every prediction dict, cache key and
+# serialized list reuses it instead of a fresh copy per schedule row
+_TEAM_INTERN = {team: sys.intern(team) for team in team_index_current}
+
 
 
 
@@ -260,11 +266,11 @@ class NBAPredictionService:
             
             games = []
             for _, row in todays_games.iterrows():
-                home_team = row["Home Team"]
-                away_team = row["Away Team"]
+                home_team = _TEAM_INTERN.get(row["Home Team"])
+                away_team = _TEAM_INTERN.get(row["Away Team"])
                 location = row.get("Location", "")
                 # Only include if both teams are in the current team index
-                if home_team in team_index_current and away_team in team_index_current:
+                if home_team is not None and away_team is not None:
                     games.append([home_team, away_team, location])
             
             print(f"[NBAPredictionService] Found {len(games)} games from schedule for {target_date}")
@@ -584,35 +590,78 @@ class NBAPredictionService:
         Returns:
             List of prediction dictionaries for that date
         """
-        # Get games for this specific date from schedule
-        games = self._get_games_from_schedule(target_date)
-        
-        if not games:
-            return []
-        
-        # Prepare data for this date
-        result = self._prepare_game_data(games, df, odds, schedule_df, target_date)
-        if result[0] is None:
+        return self._predict_for_dates([target_date], df, schedule_df, odds)
+
+    def _predict_for_dates(
+        self,
+        target_dates: List[datetime],
+        df: pd.DataFrame,
+        schedule_df: pd.DataFrame,
+        odds: Optional[Dict]
+    ) -> List[Dict[str, Any]]:
+        """
+        Generate predictions for several dates with one model pass.
+
+        Feature matrices of all dates are stacked so each XGBoost model runs
+        once over every row, and AI insights for all dates are read in a
+        single query. Returns predictions in date order.
+        """
+        prepared = []
+        for target_date in target_dates:
+            # Get games for this specific date from schedule
+            games = self._get_games_from_schedule(target_date)
+            if not games:
+                continue
+            # Prepare data for this date
+            result = self._prepare_game_data(games, df, odds, schedule_df, target_date)
+            if result[0] is None:
+                continue
+            prepared.append((target_date, games, result))
+
+        if not prepared:
             return []
-        
+
+        # Make predictions using XGBoost models (one forward pass for all dates)
+        ml_data = np.concatenate([result[0] for _, _, result in prepared])
+        # Over/Under features: ML features plus the OU line as the last column
+        uo_data = np.concatenate([
+            np.column_stack((result[2].values.astype(float), np.asarray(result[1], dtype=float)))
+            for _, _, result in prepared
+        ])
+        ml_all = _predict_probs(XGBoost_Runner.xgb_ml, ml_data, XGBoost_Runner.xgb_ml_calibrator)
+        ou_all = _predict_probs(XGBoost_Runner.xgb_uo, uo_data, XGBoost_Runner.xgb_uo_calibrator)
+
+        try:
+            insights_by_date = get_insights_for_dates([str(d.date()) for d, _, _ in prepared])
+        except Exception as e:
+            # DB down: still return predictions, with "Análisis pendiente" AI data
+            print(f"  [AI Cache] Error prefetching insights: {e}")
+            insights_by_date = {str(d.date()): {} for d, _, _ in prepared}
+
+        predictions = []
+        offset = 0
+        for target_date, games, result in prepared:
+            rows = len(result[0])
+            predictions.extend(self._build_predictions(
+                target_date, games, result,
+                ml_all[offset:offset + rows], ou_all[offset:offset + rows],
+                insights_by_date.get(str(target_date.date()))
+            ))
+            offset += rows
+        return predictions
+
+    def _build_predictions(
+        self,
+        target_date: datetime,
+        games: List[List[str]],
+        result: tuple,
+        ml_predictions,
+        ou_predictions,
+        insights: Optional[Dict[str, Dict[str, Any]]] = None
+    ) -> List[Dict[str, Any]]:
+        """Turn one date's model outputs into prediction dicts."""
         data, games_uo, frame_ml, home_team_odds, away_team_odds, game_start_times, game_locations = result
         
-        # Make predictions using XGBoost models
-        ml_predictions = _predict_probs(
-            XGBoost_Runner.xgb_ml, 
-            data, 
-            XGBoost_Runner.xgb_ml_calibrator
-        )
-        
-        # Prepare Over/Under data
-        frame_uo = frame_ml.copy()
-        frame_uo["OU"] = np.asarray(games_uo, dtype=float)
-        ou_predictions = _predict_probs(
-            XGBoost_Runner.xgb_uo, 
-            frame_uo.values.astype(float), 
-            XGBoost_Runner.xgb_uo_calibrator
-        )
-        
         # Build predictions list
         predictions = []
         for idx, game in enumerate(games):
@@ -628,15 +677,18 @@ class NBAPredictionService:
             # --- AI INVESTIGATION LAYER (CACHE-BASED) ---
             # Read pre-computed insights from database cache (instant)
             # Background worker (ai_worker.py) populates this cache
-            from .database import get_ai_insight
             
             ai_data = {"summary": "Análisis pendiente", "impact_score": 0.0, "key_factors": [], "confidence": 0}
             game_date = str(target_date.date())
             
             try:
-                # Get cached insights for both teams
-                h_insight = get_ai_insight(home_team, game_date)
-                a_insight = get_ai_insight(away_team, game_date)
+                # Get cached insights for both teams (prefetched for the date when available)
+                if insights is not None:
+                    h_insight = insights.get(home_team)
+                    a_insight = insights.get(away_team)
+                else:
+                    h_insight = get_ai_insight(home_team, game_date)
+                    a_insight = get_ai_insight(away_team, game_date)
                 
                 if h_insight or a_insight:
                     h_score = h_insight.get("impact_score", 0) if h_insight else 0
@@ -701,7 +753,7 @@ class NBAPredictionService:
                     o = float(us_odds)
                     if o > 0: return (o / 100) + 1
                     else: return (100 / abs(o)) + 1
-                except: return 1.0
+                except (TypeError, ValueError, ZeroDivisionError): return 1.0
 
             if home_team_odds[idx]: h_odds_dec = to_decimal(home_team_odds[idx])
             if away_team_odds[idx]: a_odds_dec = to_decimal(away_team_odds[idx])
@@ -794,8 +846,6 @@ class NBAPredictionService:
             print(f"[NBAPredictionService] Fetched live scores for {len(self._live_scores)} games")
             
             # Generate predictions for each date
-            all_predictions = []
-            
             dates_to_process = []
             if target_date:
                 dates_to_process.append(target_date)
@@ -804,12 +854,9 @@ class NBAPredictionService:
                 for day_offset in range(days):
                     dates_to_process.append(today + timedelta(days=day_offset))
             
-            for current_date in dates_to_process:
-                day_predictions = self._predict_for_date(
-                    current_date, df, schedule_df, odds
-                )
-                all_predictions.extend(day_predictions)
-                print(f"[NBAPredictionService] Found {len(day_predictions)} games for {current_date.date()}")
+            # All days share one stacked model pass and one insight query
+            all_predictions = self._predict_for_dates(dates_to_process, df, schedule_df, odds)
+            print(f"[NBAPredictionService] Found {len(all_predictions)} games for {len(dates_to_process)} day(s)")
             
             # Sort by start time (earliest first)
             all_predictions.sort(
@@ -833,24 +880,28 @@ class NBAPredictionService:
             return []
 
 
-# Singleton instance for API usage
-_service_instance: Optional[NBAPredictionService] = None
+# One service per sportsbook for API usage (LRU-bounded: sportsbook comes from the query string)
+SERVICE_CACHE_SIZE = 8
+_service_lock = threading.Lock()  # API threads may race to build the same service
+
+
+@lru_cache(maxsize=SERVICE_CACHE_SIZE)
+def _service_for(sportsbook: str) -> NBAPredictionService:
+    print(f"[NBAPredictionService] Creating new service instance ({sportsbook})...")
+    service = NBAPredictionService(sportsbook=sportsbook)
+    # XGBoost models are module globals, loaded once and shared by every service
+    if not service.load_models():
+        print("[NBAPredictionService] WARNING: Models failed to load")
+    return service
 
 
 def reset_service():
-    """Reset the singleton service (for testing/reloading)"""
-    global _service_instance
-    _service_instance = None
+    """Drop the cached services (for testing/reloading); models stay loaded"""
+    with _service_lock:
+        _service_for.cache_clear()
 
 
 def get_prediction_service(sportsbook: str = "fanduel") -> NBAPredictionService:
-    """Get or create singleton prediction service"""
-    global _service_instance
-    if _service_instance is None:
-        print("[NBAPredictionService] Creating new service instance...")
-        _service_instance = NBAPredictionService(sportsbook=sportsbook)
-        success = _service_instance.load_models()
-        if not success:
-            print("[NBAPredictionService] WARNING: Models failed to load")
-    return _service_instance
-
+    """Get or create the prediction service for a sportsbook"""
+    with _service_lock:
+        return _service_for(sportsbook.strip().lower())
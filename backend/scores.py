@@ -28,8 +28,10 @@ TEAM_MAP = {
     "Trail Blazers": "POR", "Kings": "SAC", "Spurs": "SAS", "Raptors": "TOR", "Jazz": "UTA", "Wizards": "WAS"
 }
 
+_TEAM_MAP_NORM = {k.strip().casefold(): v for k, v in TEAM_MAP.items()}
+
 def get_team_abbr(name: str) -> str:
-    return TEAM_MAP.get(name, name.upper()[:3])
+    return _TEAM_MAP_NORM.get(name.strip().casefold(), name.upper()[:3])
 
 def fetch_scores_for_date(date_obj: datetime) -> Dict[str, Dict[str, Any]]:
     """
@@ -174,6 +174,48 @@ def test_database():
                 log_finding("Database", "Stats Query", "WARN", "Stats structure unexpected", "LOW")
         except Exception as e:
             log_finding("Database", "Stats Query", "FAIL", f"Failed: {e}", "MEDIUM")
+        
+        # Test 1.9: Audit round-trip (settle -> unchanged re-audit is a no-op)
+        try:
+            from backend.database import db_conn, update_prediction_results_bulk, get_history_version
+            audit_date = "2000-01-01"  # far past: never collides with real game days
+            save_predictions([{
+                "home_team": "TEST_HOME",
+                "away_team": "TEST_AWAY",
+                "predicted_winner": "TEST_HOME",
+                "home_win_probability": 55.0,
+                "away_win_probability": 45.0,
+                "winner_confidence": 55.0,
+                "under_over_prediction": "OVER",
+                "under_over_line": 220.0,
+                "ou_confidence": 60.0,
+                "home_odds": -150,
+                "away_odds": 130,
+                "start_time_utc": f"{audit_date}T23:00:00Z",
+                "timestamp": datetime.now().isoformat(),
+            }])
+            final = [{"home_team": "TEST_HOME", "away_team": "TEST_AWAY",
+                      "home_score": 110, "away_score": 100, "status": "FINAL"}]
+            try:
+                first = update_prediction_results_bulk(audit_date, final)
+                version = get_history_version(audit_date)
+                second = update_prediction_results_bulk(audit_date, final)
+                settled = get_history(limit=0, game_date=audit_date)
+                
+                assert first["audited"] == 1 and first["correct"] == 1, f"first audit: {first}"
+                assert second["matched"] == 1 and second["audited"] == 0, f"re-audit: {second}"
+                assert get_history_version(audit_date) == version, "re-audit rewrote the row"
+                assert settled and settled[0].get("status") == "FINAL" and settled[0].get("is_correct") == 1, \
+                    f"stored game: {settled}"
+                log_finding("Database", "Audit Round-Trip", "PASS", f"First {first}, re-audit {second}")
+            finally:
+                with db_conn() as conn:
+                    with conn.cursor() as cursor:
+                        cursor.execute("DELETE FROM predictions WHERE prediction_date = %s", (audit_date,))
+        except AssertionError as e:
+            log_finding("Database", "Audit Round-Trip", "FAIL", f"Mismatch: {e}", "HIGH")
+        except Exception as e:
+            log_finding("Database", "Audit Round-Trip", "FAIL", f"Failed: {e}", "HIGH")
             
     except ImportError as e:
         log_finding("Database", "Import Test", "FAIL", f"Import failed: {e}", "CRITICAL")
@@ -286,10 +328,10 @@ def test_ai_integrations():
         try:
             investigator = SportsInvestigator()
             news = investigator.search_news("Lakers NBA news")
-            if news and "Error" not in news and len(news) > 50:
+            if news and len(news) > 50:
                 log_finding("AI", "News Search", "PASS", f"Retrieved {len(news)} chars of news context")
             else:
-                log_finding("AI", "News Search", "WARN", f"Search returned limited/error: {news[:100]}", "MEDIUM")
+                log_finding("AI", "News Search", "WARN", f"Search returned limited/error: {(news or 'no results')[:100]}", "MEDIUM")
         except Exception as e:
             log_finding("AI", "News Search", "FAIL", f"Failed: {e}", "HIGH")
         
@@ -417,6 +459,48 @@ def test_finance_engine():
                 log_finding("Finance", "Portfolio Optimization", "FAIL", f"Expected list, got {type(bets)}", "HIGH")
         except Exception as e:
             log_finding("Finance", "Portfolio Optimization", "FAIL", f"Failed: {e}", "HIGH")
+        
+        # Test 4.5: Vectorized optimize_portfolio matches the per-bet loop
+        try:
+            import random
+            
+            def reference_portfolio(predictions, bankroll):
+                # The original loop: sniper_check + calculate_kelly_bet per side
+                bets = []
+                for pred in predictions:
+                    for side in ("home", "away"):
+                        odds = pred.get(f"{side}_odds", 0)
+                        prob = pred.get(f"{side}_win_probability", 50) / 100.0
+                        if sniper_check(prob, odds)[0]:
+                            stake = calculate_kelly_bet(prob, odds, bankroll)
+                            if stake > 0:
+                                bets.append((pred.get(f"{side}_team"), odds, round(stake, 2)))
+                return bets
+            
+            rng = random.Random(42)
+            odds_pool = [0, -150, 1.0, 1.5, 1.6, 1.61, 1.85, 2.0, 2.5, 3.4, 5.0]
+            mock_preds = []
+            for i in range(200):
+                home_prob = round(rng.uniform(0, 100), 1)
+                mock_preds.append({
+                    "home_team": f"H{i}", "away_team": f"A{i}",
+                    "home_win_probability": home_prob,
+                    "away_win_probability": round(100 - home_prob, 1),
+                    "home_odds": rng.choice(odds_pool),
+                    "away_odds": rng.choice(odds_pool),
+                    "start_time_utc": "2026-01-18T00:00:00Z"
+                })
+            mock_preds.append({"home_team": "NO_ODDS", "away_team": "NO_PROBS"})  # all defaults
+            
+            for bankroll in (100, 10000, 2500000):
+                expected = reference_portfolio(mock_preds, bankroll)
+                actual = [(b.selection, b.odds, b.stake_amount) for b in optimize_portfolio(mock_preds, bankroll)]
+                assert actual == expected, f"bankroll {bankroll}: {len(actual)} vs {len(expected)} bets"
+            log_finding("Finance", "Portfolio Parity", "PASS", f"Vectorized == loop on {len(mock_preds)} games x 3 bankrolls")
+        except AssertionError as e:
+            log_finding("Finance", "Portfolio Parity", "FAIL", f"Mismatch: {e}", "HIGH")
+        except Exception as e:
+            log_finding("Finance", "Portfolio Parity", "FAIL", f"Failed: {e}", "HIGH")
             
     except ImportError as e:
         log_finding("Finance", "Import Test", "FAIL", f"Import failed: {e}", "CRITICAL")
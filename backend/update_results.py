@@ -42,6 +42,7 @@ def reconcile_bets():
         
     resolved_count = 0
     total_pnl = 0.0
+    settlements = [] # (bet_id, status, pnl), written in one statement below
     
     for bet in pending_bets:
         bet_date = bet['date']
@@ -75,12 +76,12 @@ def reconcile_bets():
                     
                     if won:
                         profit = (bet['stake_amount'] * bet['odds']) - bet['stake_amount']
-                        database.update_bet_status(bet['id'], "WON", profit)
+                        settlements.append((bet['id'], "WON", profit))
                         print(f"✅ Bet {bet['id']} WON: {bet['match']} ({bet['selection']}) +${profit:.2f}")
                         total_pnl += profit
                     else:
                         loss = -bet['stake_amount']
-                        database.update_bet_status(bet['id'], "LOST", loss)
+                        settlements.append((bet['id'], "LOST", loss))
                         print(f"❌ Bet {bet['id']} LOST: {bet['match']} ({bet['selection']}) -${abs(loss):.2f}")
                         total_pnl += loss
                     
@@ -91,6 +92,11 @@ def reconcile_bets():
             # Maybe game hasn't happened yet or name mismatch
             pass
 
+    updated = database.update_bet_statuses_bulk(settlements)
+    if updated != len(settlements):
+        # Failed (or partial) write: don't report or snapshot PnL the ledger doesn't hold
+        print(f"[Reconcile] Bet settlement write updated {updated}/{len(settlements)} bets; skipping portfolio snapshot")
+        return
     print(f"Resolved {resolved_count} bets. Total Daily PnL: ${total_pnl:.2f}")
     
     # 4. Update Portfolio Snapshot (Simplified)
@@ -16,7 +16,8 @@ import traceback
 import time
 from datetime import datetime
 from threading import Thread
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
 
 from backend.timezone import get_current_date
 from backend.predictor import get_prediction_service
@@ -27,6 +28,9 @@ from backend.database import save_daily_cache, save_predictions, save_ai_insight
 # Import AI Researcher
 from ai_researcher import SportsInvestigator
 
+# Parallel DDG news searches during the investigation batch
+NEWS_SEARCH_WORKERS = 8
+
 def run_ai_investigation_batch(teams: List[str], game_date: str):
     """
     Runs the AI Researcher for a list of teams.
@@ -35,25 +39,35 @@ def run_ai_investigation_batch(teams: List[str], game_date: str):
     print(f"🕵️ [AI Worker] Starting investigation for {len(teams)} teams...")
     investigator = SportsInvestigator()
     
-    for team in teams:
-        try:
-            # 1. Search News (Injuries, lineups)
-            query = f"{team} NBA injuries news lineup"
-            news_context = investigator.search_news(query)
-            
-            # 2. Analyze Impact
-            analysis = investigator.analyze_impact(news_context, team)
-            
-            # 3. Save to DB
-            save_ai_insight(team, game_date, analysis)
-            print(f"✅ [AI Worker] Insight saved for {team} (Impact: {analysis.get('impact_score')})")
-            
-            # Rate limiting to avoid API bans (DuckDuckGo/Groq)
-            time.sleep(2) 
-            
-        except Exception as e:
-            print(f"❌ [AI Worker] Failed to investigate {team}: {e}")
-
+    try:
+        # 1. Search News (Injuries, lineups) for every team in parallel; DDG calls are I/O-bound
+        def fetch_news(team: str) -> Optional[str]:
+            try:
+                return investigator.search_news(f"{team} NBA injuries news lineup")
+            except Exception as e:
+                print(f"❌ [AI Worker] News search failed for {team}: {e}")
+                return None
+        
+        with ThreadPoolExecutor(max_workers=NEWS_SEARCH_WORKERS) as executor:
+            news_by_team = dict(zip(teams, executor.map(fetch_news, teams)))
+        
+        for team, news_context in news_by_team.items():
+            try:
+                # 2. Analyze Impact
+                analysis = investigator.analyze_impact(news_context, team)
+                
+                # 3. Save to DB
+                save_ai_insight(team, game_date, analysis)
+                print(f"✅ [AI Worker] Insight saved for {team} (Impact: {analysis.get('impact_score')})")
+                
+                # Rate limiting to avoid Groq API bans
+                time.sleep(2) 
+                
+            except Exception as e:
+                print(f"❌ [AI Worker] Failed to investigate {team}: {e}")
+    finally:
+        # Release the DDGS/HTTP sessions even if something escapes above
+        investigator.close()
     print("🏁 [AI Worker] Investigation batch complete.")
 
 